@@ -1,16 +1,73 @@
+from __future__ import annotations
+
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import requests
-import json
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
+import hashlib
+import io
+import re
+import threading
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 import time
 import base64
-from typing import Dict, Any, List
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 # Configuration
 BACKEND_URL = "http://localhost:8000"
+REGULATION_COLUMNS = [
+    'regulation', 'compliance_score', 'risk_assessment', 'issues',
+    'recommendations', 'missing_clauses', 'legal_references'
+]
+# Bullet lines ("• point") in the executive summary, whitespace excluding newlines trimmed
+_BULLET_RE = re.compile(r'(?m)^[^\S\n]*•[^\S\n]*(.+?)[^\S\n]*$')
+# Static page styles, defined once at import instead of rebuilt in main() on every rerun
+_CSS = """
+<style>
+.main-header {
+    font-size: 2.5rem;
+    color: #1f77b4;
+    text-align: center;
+    margin-bottom: 2rem;
+}
+.commercial-badge {
+    background-color: #ff6b6b;
+    color: white;
+    padding: 0.2rem 0.5rem;
+    border-radius: 0.25rem;
+    font-size: 0.8rem;
+    font-weight: bold;
+}
+.notification-panel {
+    background-color: #f0f2f6;
+    padding: 1rem;
+    border-radius: 0.5rem;
+    border-left: 4px solid #1f77b4;
+}
+.regulation-card {
+    background-color: #f8f9fa;
+    padding: 1rem;
+    border-radius: 0.5rem;
+    border-left: 4px solid #1f77b4;
+    margin-bottom: 1rem;
+}
+</style>
+"""
+# (connect, read) timeouts: an unreachable backend fails fast, long analyses still get two minutes
+CONNECT_TIMEOUT = 5
+ANALYSIS_TIMEOUT = (CONNECT_TIMEOUT, 120)
+REQUEST_TIMEOUT = (CONNECT_TIMEOUT, 30)
+# Dashboard panels are cheap reads on a local backend; never hold up a rerun for long
+DASHBOARD_TIMEOUT = (1, 3)
+# Bump when the analysis response schema changes so cached results are discarded
+ANALYSIS_CACHE_VERSION = 1
 st.set_page_config(
     page_title="Commercial AI Compliance Checker",
     page_icon="⚖️",
@@ -18,6 +75,32 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+@st.cache_resource
+def get_session() -> requests.Session:
+    """Shared HTTP session so every rerun and user reuses the same keep-alive connection pool"""
+    session = requests.Session()
+    # Analyses and notifications are not idempotent: never re-send after a read timeout, and only
+    # retry statuses the backend returns before doing any work (429/503, honouring Retry-After)
+    session.mount("http://", HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=20,
+        max_retries=Retry(
+            total=3,
+            read=0,
+            backoff_factor=0.5,
+            status_forcelist=(429, 503),
+            allowed_methods=frozenset({"GET", "POST"}),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+    ))
+    return session
+
+def read_json(response: requests.Response) -> Any:
+    """Parse a streamed JSON response straight from its raw bytes"""
+    # orjson parses bytes directly, skipping the str copy and stdlib decoder behind response.json()
+    return orjson.loads(response.content)
+
 def init_session_state():
     """Initialize session state variables"""
     defaults = {
@@ -27,51 +110,68 @@ def init_session_state():
         'analysis_history': [],
         'current_tab': "analyze",
         'batch_results': None,
-        'notifications_enabled': True
+        'notifications_enabled': True,
+        'notification_platforms': {"email": True, "slack": True, "sheets": True}
     }
     
     for key, value in defaults.items():
         if key not in st.session_state:
             st.session_state[key] = value
 
-def check_api_health():
-    """Check if backend API is healthy"""
+@st.cache_data(ttl=30, show_spinner=False)
+def _fetch_health() -> Tuple[str, Optional[Dict[str, Any]]]:
+    """Probe the backend health endpoint, shared across sessions for the TTL window"""
     try:
-        response = requests.get(f"{BACKEND_URL}/health", timeout=10)
+        response = get_session().get(f"{BACKEND_URL}/health", timeout=(CONNECT_TIMEOUT, 10))
         if response.status_code == 200:
-            data = response.json()
-            st.session_state.api_status = data.get('status', 'healthy')
-            return data
+            data = read_json(response)
+            return data.get('status', 'healthy'), data
         else:
-            st.session_state.api_status = "unhealthy"
-            return None
-    except:
-        st.session_state.api_status = "unreachable"
-        return None
+            return "unhealthy", None
+    except Exception:
+        return "unreachable", None
+
+def check_api_health():
+    """Check if backend API is healthy"""
+    api_status, data = _fetch_health()
+    st.session_state.api_status = api_status
+    return data
+
+@st.cache_data(ttl=3600, max_entries=128, show_spinner="🔍 Analyzing contract compliance...")
+def _analyze_cached(contract_text: str, regulations: Optional[Tuple[str, ...]], jurisdiction: str,
+                    industry: str, cache_version: int) -> Dict[str, Any]:
+    """Run a backend analysis; identical requests within the TTL are served from cache"""
+    payload = {
+        "contract_text": contract_text,
+        "regulations": list(regulations) if regulations else None,
+        "jurisdiction": jurisdiction,
+        "industry": industry
+    }
+    
+    response = get_session().post(
+        f"{BACKEND_URL}/analyze-text/",
+        json=payload,
+        timeout=ANALYSIS_TIMEOUT,
+        stream=True
+    )
+    # Raise instead of returning None so failed analyses are never cached
+    response.raise_for_status()
+    return read_json(response)
 
 def analyze_contract_text(contract_text: str, regulations: List[str] = None, 
                          jurisdiction: str = "US", industry: str = "general"):
     """Send contract text to backend for analysis"""
     try:
-        payload = {
-            "contract_text": contract_text,
-            "regulations": regulations,
-            "jurisdiction": jurisdiction,
-            "industry": industry
-        }
-        
-        with st.spinner("🔍 Analyzing contract compliance..."):
-            response = requests.post(
-                f"{BACKEND_URL}/analyze-text/",
-                json=payload,
-                timeout=120
-            )
-            
-        if response.status_code == 200:
-            return response.json()
-        else:
-            st.error(f"Analysis failed: {response.text}")
-            return None
+        return _analyze_cached(
+            contract_text,
+            tuple(regulations) if regulations else None,
+            jurisdiction,
+            industry,
+            ANALYSIS_CACHE_VERSION
+        )
+    except requests.HTTPError as e:
+        st.error(f"Analysis failed: {e.response.text}")
+        return None
     except Exception as e:
         st.error(f"Error connecting to backend: {e}")
         return None
@@ -80,15 +180,18 @@ def upload_contract_file(uploaded_file):
     """Upload contract file to backend"""
     try:
         with st.spinner("📤 Uploading and analyzing contract..."):
-            files = {"file": (uploaded_file.name, uploaded_file.getvalue(), "application/pdf")}
-            response = requests.post(
+            # UploadedFile is file-like, so hand it to requests instead of copying it with getvalue()
+            uploaded_file.seek(0)
+            files = {"file": (uploaded_file.name, uploaded_file, "application/pdf")}
+            response = get_session().post(
                 f"{BACKEND_URL}/upload-contract/",
                 files=files,
-                timeout=120
+                timeout=ANALYSIS_TIMEOUT,
+                stream=True
             )
             
         if response.status_code == 200:
-            return response.json()
+            return read_json(response)
         else:
             st.error(f"Upload failed: {response.text}")
             return None
@@ -96,8 +199,66 @@ def upload_contract_file(uploaded_file):
         st.error(f"Error uploading file: {e}")
         return None
 
+@st.cache_resource
+def _executor() -> ThreadPoolExecutor:
+    """Worker pool for backend fetches that can run while the page renders"""
+    return ThreadPoolExecutor(max_workers=4)
+
+def _submit_fetch(func, *args) -> Future:
+    """Run a cached fetch in the worker pool under the current script run's context"""
+    ctx = get_script_run_ctx()
+    
+    def run():
+        # Pool threads serve every session; st.cache_data needs the context of this run
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return func(*args)
+    
+    return _executor().submit(run)
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _fetch_stats() -> Dict[str, Any]:
+    """Fetch database-wide statistics from the backend"""
+    response = get_session().get(f"{BACKEND_URL}/stats", timeout=DASHBOARD_TIMEOUT, stream=True)
+    response.raise_for_status()
+    return read_json(response)
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _fetch_history(limit: int = 10) -> Dict[str, Any]:
+    """Fetch recent analysis history from the backend"""
+    response = get_session().get(
+        f"{BACKEND_URL}/analysis-history",
+        params={"limit": limit},
+        timeout=DASHBOARD_TIMEOUT,
+        stream=True
+    )
+    response.raise_for_status()
+    return read_json(response)
+
+def _refresh_dashboard():
+    """Drop cached stats/history; runs as a button callback, before the fetches are submitted"""
+    _fetch_stats.clear()
+    _fetch_history.clear()
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _search_contracts(query: str, limit: int = 5) -> Dict[str, Any]:
+    """Search stored contracts; repeated queries within the TTL skip the backend"""
+    response = get_session().get(
+        f"{BACKEND_URL}/search-contracts",
+        params={"query": query, "limit": limit},
+        timeout=REQUEST_TIMEOUT,
+        stream=True
+    )
+    response.raise_for_status()
+    return read_json(response)
+
 def send_notification(platform: str, message: str, recipients: List[str] = None):
     """Send notification through specified platform"""
+    # Skip the backend round-trip entirely when the platform is switched off in settings
+    if not st.session_state.get('notifications_enabled', True) or \
+            not st.session_state.get('notification_platforms', {}).get(platform, True):
+        st.info(f"{platform.title()} notifications are disabled in Notification Settings")
+        return False
+    
     try:
         payload = {
             "contract_id": st.session_state.analysis_results.get('analysis_id', 'unknown'),
@@ -106,14 +267,82 @@ def send_notification(platform: str, message: str, recipients: List[str] = None)
             "recipients": recipients or ["admin@company.com"]
         }
         
-        response = requests.post(f"{BACKEND_URL}/send-notification/", json=payload)
-        return response.status_code == 200
+        # Repeated clicks for the same analysis, platform, recipients and message are answered
+        # locally; nothing was sent, so callers don't report a send
+        sent = st.session_state.setdefault('_sent_notifications', set())
+        key = (
+            payload['contract_id'],
+            platform,
+            tuple(sorted(recipient.strip() for recipient in payload['recipients'])),
+            hashlib.blake2b(message.encode(), digest_size=8).digest()
+        )
+        if key in sent:
+            st.toast(f"{platform.title()} notification already sent for this analysis")
+            return False
+        
+        response = get_session().post(f"{BACKEND_URL}/send-notification/", json=payload, timeout=REQUEST_TIMEOUT)
+        if response.status_code == 200:
+            sent.add(key)
+            return True
+        return False
     except Exception as e:
         st.error(f"Notification failed: {e}")
         return False
 
-def display_compliance_dashboard(results: Dict[str, Any]):
+def build_regulation_frame(results: Dict[str, Any]) -> pd.DataFrame:
+    """Build one row per regulation with the derived columns used across the Results tab"""
+    # pandas and plotly are imported on first use to keep them off the cold-start path
+    import pandas as pd
+    
+    reg_df = pd.DataFrame(results['results'], columns=REGULATION_COLUMNS)
+    reg_df['n_issues'] = reg_df['issues'].str.len()
+    reg_df['n_missing'] = reg_df['missing_clauses'].str.len()
+    reg_df['score_pct'] = reg_df['compliance_score'] * 100
+    reg_df['risk_label'] = reg_df['risk_assessment'].str.upper()
+    return reg_df
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _build_dashboard_figs(analysis_id: str, analysis_timestamp: str,
+                          _reg_df: pd.DataFrame) -> Tuple[Optional[dict], Optional[dict]]:
+    """Build the dashboard bar charts once per analysis and return them as Plotly dicts"""
+    import plotly.express as px
+    
+    if _reg_df.empty:
+        return None, None
+    
+    chart_df = _reg_df[['regulation', 'score_pct', 'risk_label', 'n_issues', 'n_missing']].rename(columns={
+        'regulation': 'Regulation',
+        'score_pct': 'Score',
+        'risk_label': 'Risk',
+        'n_issues': 'Issues',
+        'n_missing': 'Missing Clauses'
+    })
+    
+    score_fig = px.bar(
+        chart_df, 
+        x='Regulation', 
+        y='Score',
+        color='Risk',
+        title="Compliance Score by Regulation",
+        color_discrete_map={'HIGH': '#EF553B', 'MEDIUM': '#FFA15A', 'LOW': '#00CC96'}
+    )
+    score_fig.update_layout(height=300)
+    
+    issues_fig = px.bar(
+        chart_df, 
+        x='Regulation', 
+        y=['Issues', 'Missing Clauses'],
+        title="Issues & Missing Clauses by Regulation",
+        barmode='group'
+    )
+    issues_fig.update_layout(height=300)
+    
+    return score_fig.to_dict(), issues_fig.to_dict()
+
+def display_compliance_dashboard(results: Dict[str, Any], reg_df: pd.DataFrame):
     """Display commercial-grade compliance dashboard"""
+    import plotly.graph_objects as go
+    
     st.subheader("📊 Compliance Executive Dashboard")
     
     # Key metrics
@@ -129,11 +358,11 @@ def display_compliance_dashboard(results: Dict[str, Any]):
         )
     
     with col2:
-        total_issues = sum(len(reg['issues']) for reg in results['results'])
+        total_issues = int(reg_df['n_issues'].sum())
         st.metric("Total Issues Found", total_issues)
     
     with col3:
-        regulations_analyzed = len(results['results'])
+        regulations_analyzed = len(reg_df)
         st.metric("Regulations Analyzed", regulations_analyzed)
     
     with col4:
@@ -142,52 +371,23 @@ def display_compliance_dashboard(results: Dict[str, Any]):
         st.metric("Risk Level", risk_level)
     
     # Risk assessment visualization
+    score_fig, issues_fig = _build_dashboard_figs(
+        results.get('analysis_id', ''),
+        results.get('analysis_timestamp', ''),
+        reg_df
+    )
+    
     col1, col2 = st.columns(2)
     
     with col1:
         # Risk distribution chart
-        risk_data = []
-        for reg in results['results']:
-            risk_data.append({
-                'Regulation': reg['regulation'],
-                'Score': reg['compliance_score'] * 100,
-                'Risk': reg['risk_assessment'].upper()
-            })
-        
-        if risk_data:
-            df = pd.DataFrame(risk_data)
-            fig = px.bar(
-                df, 
-                x='Regulation', 
-                y='Score',
-                color='Risk',
-                title="Compliance Score by Regulation",
-                color_discrete_map={'HIGH': '#EF553B', 'MEDIUM': '#FFA15A', 'LOW': '#00CC96'}
-            )
-            fig.update_layout(height=300)
-            st.plotly_chart(fig, use_container_width=True)
+        if score_fig:
+            st.plotly_chart(go.Figure(score_fig), use_container_width=True)
     
     with col2:
         # Issues by regulation
-        issues_data = []
-        for reg in results['results']:
-            issues_data.append({
-                'Regulation': reg['regulation'],
-                'Issues': len(reg['issues']),
-                'Missing Clauses': len(reg['missing_clauses'])
-            })
-        
-        if issues_data:
-            df = pd.DataFrame(issues_data)
-            fig = px.bar(
-                df, 
-                x='Regulation', 
-                y=['Issues', 'Missing Clauses'],
-                title="Issues & Missing Clauses by Regulation",
-                barmode='group'
-            )
-            fig.update_layout(height=300)
-            st.plotly_chart(fig, use_container_width=True)
+        if issues_fig:
+            st.plotly_chart(go.Figure(issues_fig), use_container_width=True)
     
     # Notification panel
     st.subheader("🔔 Notification Center")
@@ -220,24 +420,24 @@ Critical issues require immediate attention.
     
     st.divider()
 
-def display_regulation_details(results: Dict[str, Any]):
+def display_regulation_details(reg_df: pd.DataFrame):
     """Display detailed analysis for each regulation"""
     st.subheader("📈 Regulation-wise Detailed Analysis")
     
-    for regulation in results['results']:
+    for regulation in reg_df.itertuples(index=False):
         # Create a card-like layout instead of nested expanders
         st.markdown("---")
         
         # Regulation header
         col1, col2 = st.columns([3, 1])
         with col1:
-            st.markdown(f"### {regulation['regulation']}")
+            st.markdown(f"### {regulation.regulation}")
         with col2:
-            score_color = "green" if regulation['compliance_score'] > 0.7 else "orange" if regulation['compliance_score'] > 0.5 else "red"
-            risk_color = "red" if regulation['risk_assessment'] == 'high' else "orange" if regulation['risk_assessment'] == 'medium' else "green"
+            score_color = "green" if regulation.compliance_score > 0.7 else "orange" if regulation.compliance_score > 0.5 else "red"
+            risk_color = "red" if regulation.risk_assessment == 'high' else "orange" if regulation.risk_assessment == 'medium' else "green"
             
-            st.markdown(f"**Score:** :{score_color}[{regulation['compliance_score']*100:.1f}%]")
-            st.markdown(f"**Risk:** :{risk_color}[{regulation['risk_assessment'].upper()}]")
+            st.markdown(f"**Score:** :{score_color}[{regulation.score_pct:.1f}%]")
+            st.markdown(f"**Risk:** :{risk_color}[{regulation.risk_label}]")
         
         # Issues and Recommendations in columns
         col1, col2 = st.columns(2)
@@ -245,31 +445,31 @@ def display_regulation_details(results: Dict[str, Any]):
         with col1:
             with st.container():
                 st.markdown("##### 🚨 Compliance Issues")
-                for issue in regulation['issues']:
-                    st.error(f"• {issue}")
+                # One element per list keeps the number of messages sent to the browser constant
+                if regulation.issues:
+                    st.error("\n".join(f"- {issue}" for issue in regulation.issues))
         
         with col2:
             with st.container():
                 st.markdown("##### 💡 Actionable Recommendations")
-                for recommendation in regulation['recommendations']:
-                    st.success(f"• {recommendation}")
+                if regulation.recommendations:
+                    st.success("\n".join(f"- {recommendation}" for recommendation in regulation.recommendations))
         
         # Missing clauses in an accordion-like layout
-        if regulation['missing_clauses']:
+        if regulation.missing_clauses:
             st.markdown("##### 📝 Required Clause Additions")
             
-            for i, clause in enumerate(regulation['missing_clauses']):
+            for i, clause in enumerate(regulation.missing_clauses):
                 risk_color = "🔴" if clause['risk_level'] == 'high' else "🟡" if clause['risk_level'] == 'medium' else "🟢"
                 
                 # Use a container with border for each clause
                 with st.container():
                     st.markdown(f"###### {risk_color} {clause['clause']} - {clause['risk_level'].upper()} RISK")
-                    st.write(f"**Description:** {clause['description']}")
-                    
+                    clause_details = [f"**Description:** {clause['description']}"]
                     if clause.get('legal_citation'):
-                        st.write(f"**Legal Reference:** {clause['legal_citation']}")
-                    
-                    st.write(f"**Requirements:** {', '.join(clause['requirements'])}")
+                        clause_details.append(f"**Legal Reference:** {clause['legal_citation']}")
+                    clause_details.append(f"**Requirements:** {', '.join(clause['requirements'])}")
+                    st.markdown("  \n".join(clause_details))
                     
                     # Use expander for the suggested clause (without key parameter)
                     with st.expander(f"View AI-Suggested Clause for {clause['clause']}"):
@@ -278,10 +478,9 @@ def display_regulation_details(results: Dict[str, Any]):
                 st.markdown("")  # Add some space
         
         # Legal references
-        if regulation.get('legal_references'):
+        if regulation.legal_references:
             st.markdown("##### ⚖️ Legal References")
-            for ref in regulation['legal_references']:
-                st.info(f"• {ref}")
+            st.info("\n".join(f"- {ref}" for ref in regulation.legal_references))
 
 def display_executive_summary(results: Dict[str, Any]):
     """Display executive summary for business stakeholders"""
@@ -296,14 +495,9 @@ def display_executive_summary(results: Dict[str, Any]):
         st.markdown("##### 🎯 Key Takeaways")
         
         # Extract key points from summary
-        summary_text = results['summary']
-        key_points = [
-            line.replace('•', '').strip() 
-            for line in summary_text.split('\n') 
-            if line.strip().startswith('•')
-        ]
-        
-        for point in key_points[:5]:
+        key_points = _BULLET_RE.findall(results['summary'])[:5]
+        
+        for point in key_points:
             st.write(f"• {point}")
 
 def display_modified_contract():
@@ -319,45 +513,54 @@ def display_modified_contract():
                 key="modified_contract_display"
             )
 
+@st.cache_data(max_entries=32, show_spinner=False)
+def _build_exports(analysis_id: str, analysis_timestamp: str, _results: Dict[str, Any]) -> Tuple[bytes, str, str]:
+    """Serialize the export downloads once per analysis instead of on every rerun"""
+    # analysis_id + analysis_timestamp identify the analysis; _results is skipped by the hasher.
+    # The report carries the analysis time, which unlike a build time is the same on every download
+    # Raw bytes go straight to st.download_button without a decode step
+    analysis_json = orjson.dumps(_results, option=orjson.OPT_INDENT_2)
+    executive_summary = _results.get('executive_summary', '')
+    
+    buf = io.StringIO()
+    buf.write(f"""
+COMPLIANCE ANALYSIS REPORT
+Analyzed: {analysis_timestamp or 'N/A'}
+Analysis ID: {_results.get('analysis_id', 'N/A')}
+
+OVERALL SCORE: {_results.get('overall_score', 0)*100:.1f}%
+RISK LEVEL: {_results.get('risk_level', 'N/A').upper()}
+
+EXECUTIVE SUMMARY:
+{_results.get('summary', 'N/A')}
+
+DETAILED FINDINGS:
+""")
+    for reg in _results.get('results', []):
+        buf.write(f"\n--- {reg['regulation']} ---\n")
+        buf.write(f"Score: {reg['compliance_score']*100:.1f}%\n")
+        buf.write(f"Risk: {reg['risk_assessment'].upper()}\n")
+        buf.write("Issues:\n")
+        for issue in reg['issues']:
+            buf.write(f"- {issue}\n")
+    compliance_report = buf.getvalue()
+    
+    return analysis_json, executive_summary, compliance_report
+
 def main():
     # Custom CSS
-    st.markdown("""
-    <style>
-    .main-header {
-        font-size: 2.5rem;
-        color: #1f77b4;
-        text-align: center;
-        margin-bottom: 2rem;
-    }
-    .commercial-badge {
-        background-color: #ff6b6b;
-        color: white;
-        padding: 0.2rem 0.5rem;
-        border-radius: 0.25rem;
-        font-size: 0.8rem;
-        font-weight: bold;
-    }
-    .notification-panel {
-        background-color: #f0f2f6;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        border-left: 4px solid #1f77b4;
-    }
-    .regulation-card {
-        background-color: #f8f9fa;
-        padding: 1rem;
-        border-radius: 0.5rem;
-        border-left: 4px solid #1f77b4;
-        margin-bottom: 1rem;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    st.html(_CSS)
     
     st.markdown('<h1 class="main-header">⚖️ Commercial AI Contract Compliance Checker</h1>', unsafe_allow_html=True)
     st.markdown('<p style="text-align: center; font-size: 1.2rem;">Enterprise-grade regulatory compliance analysis with multi-platform notifications</p>', unsafe_allow_html=True)
     
     init_session_state()
     
+    # Start the dashboard fetches now so they overlap with each other and with rendering
+    # the sidebar and earlier tabs
+    stats_future = _submit_fetch(_fetch_stats)
+    history_future = _submit_fetch(_fetch_history, 10)
+    
     # Sidebar
     with st.sidebar:
         st.image("https://via.placeholder.com/150x50/1f77b4/ffffff?text=COMMERCIAL", width=150)
@@ -403,6 +606,11 @@ def main():
         
         if st.button("Save Notification Settings", use_container_width=True):
             st.session_state.notifications_enabled = any([email_notifications, slack_notifications, sheets_sync])
+            st.session_state.notification_platforms = {
+                "email": email_notifications,
+                "slack": slack_notifications,
+                "sheets": sheets_sync
+            }
             st.success("Notification settings saved!")
         
         st.markdown("---")
@@ -533,24 +741,33 @@ SECURITY: The vehicle serves as collateral for this financing agreement.
         if st.session_state.analysis_results:
             results = st.session_state.analysis_results
             
+            # One frame per render feeds the dashboard metrics, charts and regulation details
+            reg_df = build_regulation_frame(results)
+            
             # Display dashboard and analysis
-            display_compliance_dashboard(results)
+            display_compliance_dashboard(results, reg_df)
             display_executive_summary(results)
-            display_regulation_details(results)
+            display_regulation_details(reg_df)
             display_modified_contract()
             
             # Export section
             st.subheader("💾 Export Results")
             
+            analysis_json, executive_summary, compliance_report = _build_exports(
+                results.get('analysis_id', ''),
+                results.get('analysis_timestamp', ''),
+                results
+            )
+            
+            export_ts = datetime.now().strftime('%Y%m%d_%H%M%S')
             col1, col2, col3, col4 = st.columns(4)
             
             with col1:
                 # Download analysis as JSON
-                analysis_json = json.dumps(results, indent=2)
                 st.download_button(
                     label="📥 Download Analysis (JSON)",
                     data=analysis_json,
-                    file_name=f"compliance_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+                    file_name=f"compliance_analysis_{export_ts}.json",
                     mime="application/json",
                     use_container_width=True
                 )
@@ -561,49 +778,27 @@ SECURITY: The vehicle serves as collateral for this financing agreement.
                     st.download_button(
                         label="📄 Download Enhanced Contract",
                         data=st.session_state.modified_contract,
-                        file_name=f"enhanced_contract_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt",
+                        file_name=f"enhanced_contract_{export_ts}.txt",
                         mime="text/plain",
                         use_container_width=True
                     )
             
             with col3:
                 # Download executive summary
-                executive_summary = results.get('executive_summary', '')
                 st.download_button(
                     label="📋 Download Executive Summary",
                     data=executive_summary,
-                    file_name=f"executive_summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt",
+                    file_name=f"executive_summary_{export_ts}.txt",
                     mime="text/plain",
                     use_container_width=True
                 )
             
             with col4:
                 # Download compliance report
-                compliance_report = f"""
-COMPLIANCE ANALYSIS REPORT
-Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-Analysis ID: {results.get('analysis_id', 'N/A')}
-
-OVERALL SCORE: {results.get('overall_score', 0)*100:.1f}%
-RISK LEVEL: {results.get('risk_level', 'N/A').upper()}
-
-EXECUTIVE SUMMARY:
-{results.get('summary', 'N/A')}
-
-DETAILED FINDINGS:
-"""
-                for reg in results.get('results', []):
-                    compliance_report += f"\n--- {reg['regulation']} ---\n"
-                    compliance_report += f"Score: {reg['compliance_score']*100:.1f}%\n"
-                    compliance_report += f"Risk: {reg['risk_assessment'].upper()}\n"
-                    compliance_report += "Issues:\n"
-                    for issue in reg['issues']:
-                        compliance_report += f"- {issue}\n"
-                
                 st.download_button(
                     label="📊 Download Full Report",
                     data=compliance_report,
-                    file_name=f"full_compliance_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt",
+                    file_name=f"full_compliance_report_{export_ts}.txt",
                     mime="text/plain",
                     use_container_width=True
                 )
@@ -615,19 +810,14 @@ DETAILED FINDINGS:
             with col1:
                 if search_query and st.button("Search Database", use_container_width=True):
                     try:
-                        search_response = requests.get(
-                            f"{BACKEND_URL}/search-contracts",
-                            params={"query": search_query, "limit": 5}
-                        )
-                        if search_response.status_code == 200:
-                            search_results = search_response.json()
-                            if search_results['results']:
-                                st.write("Similar contracts found:")
-                                for result in search_results['results']:
-                                    with st.expander(f"Relevance: {result['relevance_score']:.2f} - {result['type'].title()}"):
-                                        st.text(result['document'][:300] + "...")
-                            else:
-                                st.info("No similar contracts found.")
+                        search_results = _search_contracts(search_query, 5)
+                        if search_results['results']:
+                            st.write("Similar contracts found:")
+                            for result in search_results['results']:
+                                with st.expander(f"Relevance: {result['relevance_score']:.2f} - {result['type'].title()}"):
+                                    st.text(result['document'][:300] + "...")
+                        else:
+                            st.info("No similar contracts found.")
                     except Exception as e:
                         st.error(f"Search failed: {e}")
             
@@ -751,61 +941,61 @@ Risk: {risk_level} | Score: {score:.1%}
     
     with tab4:
         st.header("Analysis History & Statistics")
+        st.button("🔄 Refresh", on_click=_refresh_dashboard)
         
         col1, col2 = st.columns(2)
         
         with col1:
             st.subheader("📈 System Statistics")
             try:
-                stats_response = requests.get(f"{BACKEND_URL}/analysis-history", params={"limit": 5})
-                if stats_response.status_code == 200:
-                    history_data = stats_response.json()
-                    st.metric("Total Analyses", history_data.get('total', 0))
-                    st.metric("Recent Analyses", len(history_data.get('history', [])))
+                history_data = history_future.result(timeout=30)
+                # The statistics panel summarizes the five most recent analyses
+                recent_history = history_data.get('history', [])[:5]
+                try:
+                    total_analyses = stats_future.result(timeout=30).get('total_analyses', len(recent_history))
+                except Exception:
+                    total_analyses = len(recent_history)
+                st.metric("Total Analyses", total_analyses)
+                st.metric("Recent Analyses", len(recent_history))
+                
+                # Display recent analysis chart
+                if recent_history:
+                    recent_data = []
+                    for analysis in recent_history:
+                        recent_data.append({
+                            'Date': analysis.get('analysis_timestamp', '')[:10],
+                            'Risk': analysis.get('risk_level', 'medium').upper()
+                        })
                     
-                    # Display recent analysis chart
-                    if history_data.get('history'):
-                        recent_data = []
-                        for analysis in history_data['history'][:10]:
-                            recent_data.append({
-                                'Date': analysis.get('analysis_timestamp', '')[:10],
-                                'Risk': analysis.get('risk_level', 'medium').upper()
-                            })
+                    if recent_data:
+                        import plotly.express as px
                         
-                        if recent_data:
-                            df = pd.DataFrame(recent_data)
-                            risk_counts = df['Risk'].value_counts()
-                            fig = px.pie(
-                                values=risk_counts.values,
-                                names=risk_counts.index,
-                                title="Risk Level Distribution (Recent Analyses)"
-                            )
-                            st.plotly_chart(fig, use_container_width=True)
-                else:
-                    st.error("Could not fetch statistics")
-            except:
+                        risk_counts = Counter(entry['Risk'] for entry in recent_data).most_common()
+                        fig = px.pie(
+                            values=[count for _, count in risk_counts],
+                            names=[risk for risk, _ in risk_counts],
+                            title="Risk Level Distribution (Recent Analyses)"
+                        )
+                        st.plotly_chart(fig, use_container_width=True)
+            except Exception:
                 st.error("Service unavailable")
         
         with col2:
             st.subheader("🕒 Recent Analyses")
             try:
-                history_response = requests.get(f"{BACKEND_URL}/analysis-history", params={"limit": 10})
-                if history_response.status_code == 200:
-                    history_data = history_response.json()
-                    analyses = history_data.get('history', [])
-                    
-                    if analyses:
-                        for analysis in analyses[:5]:
-                            with st.expander(f"Analysis {analysis.get('analysis_id', 'Unknown')}"):
-                                st.write(f"**Jurisdiction:** {analysis.get('jurisdiction', 'Unknown')}")
-                                st.write(f"**Industry:** {analysis.get('industry', 'Unknown')}")
-                                st.write(f"**Date:** {analysis.get('analysis_timestamp', 'Unknown')}")
-                                st.write(f"**Regulations:** {', '.join(analysis.get('regulations', []))}")
-                    else:
-                        st.info("No analysis history available")
+                history_data = history_future.result(timeout=30)
+                analyses = history_data.get('history', [])
+                
+                if analyses:
+                    for analysis in analyses[:5]:
+                        with st.expander(f"Analysis {analysis.get('analysis_id', 'Unknown')}"):
+                            st.write(f"**Jurisdiction:** {analysis.get('jurisdiction', 'Unknown')}")
+                            st.write(f"**Industry:** {analysis.get('industry', 'Unknown')}")
+                            st.write(f"**Date:** {analysis.get('analysis_timestamp', 'Unknown')}")
+                            st.write(f"**Regulations:** {', '.join(analysis.get('regulations', []))}")
                 else:
-                    st.info("Could not fetch history")
-            except:
+                    st.info("No analysis history available")
+            except Exception:
                 st.error("Could not fetch history")
         
         # Notification History
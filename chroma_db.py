@@ -1,21 +1,207 @@
 import chromadb
 from chromadb.config import Settings
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+from chromadb.utils import embedding_functions
+import numpy as np
+import hashlib
 import json
-from typing import List, Dict, Any, Optional
+import os
+import shutil
+import sqlite3
+import time
+import threading
+from bisect import insort
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from functools import lru_cache
+from operator import itemgetter
+from typing import List, Dict, Any, Optional, Tuple
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Metadata values (jurisdictions, industries, regulation lists) repeat heavily across
+# records, so their JSON conversions are memoized
+_NOT_JSON = object()
+# First characters json.loads can accept; anything else is a plain string
+_JSON_START = frozenset('[{"-0123456789tfnNI')
+
+@lru_cache(maxsize=4096)
+def _cached_dumps(value_repr: Tuple, value_types: Tuple, is_dict: bool) -> str:
+    # value_types keeps 1, 1.0 and True (equal as keys) from sharing a cache entry
+    return json.dumps(dict(value_repr) if is_dict else list(value_repr))
+
+@lru_cache(maxsize=4096)
+def _cached_loads(s: str) -> Any:
+    try:
+        return json.loads(s)
+    except (json.JSONDecodeError, TypeError):
+        return _NOT_JSON
+
+def _parse_if_needed(value: Any, default: Any = None) -> Any:
+    """Python object for a stored metadata value: lists pass through, JSON strings are decoded"""
+    if isinstance(value, list):
+        return value
+    if isinstance(value, str):
+        parsed = _cached_loads(value)
+        if parsed is _NOT_JSON:
+            return value
+        # Copy so callers can't mutate the cached object
+        return parsed.copy() if isinstance(parsed, (list, dict)) else parsed
+    return default
+
+def _dumps(value) -> str:
+    """json.dumps for lists and dicts, memoized when the contents are hashable"""
+    try:
+        if isinstance(value, dict):
+            return _cached_dumps(tuple(value.items()), tuple(map(type, value.values())), True)
+        return _cached_dumps(tuple(value), tuple(map(type, value)), False)
+    except TypeError:
+        # Nested lists/dicts are not hashable
+        return json.dumps(value)
+
+def _identity(value):
+    return value
+
+# Exact-type conversions for metadata values; anything else goes through
+# CommercialChromaDBManager._convert_metadata_value
+_METADATA_HANDLERS = {
+    str: _identity,
+    int: _identity,
+    float: _identity,
+    bool: _identity,
+    type(None): lambda value: "",
+    list: _dumps,
+    dict: _dumps
+}
+
+_COLLECTION_DESCRIPTIONS = {
+    "commercial_contracts": "Commercial contract compliance analysis storage",
+    "compliance_analyses": "Compliance analysis results and metadata",
+    "regulatory_knowledge": "Regulatory knowledge and compliance rules"
+}
+
+# Metadata fields kept in the in-memory analysis frame used for statistics
+_ANALYSIS_COLUMNS = ["jurisdiction", "industry", "regulations", "analysis_timestamp", "risk_level"]
+
+# Seconds before the history index is reloaded to pick up analyses stored by other processes
+_TS_INDEX_TTL = 60
+
+# Shared by search_contracts so the per-collection queries (embedding + HNSW search, mostly
+# native code) run side by side
+_search_pool = ThreadPoolExecutor(max_workers=4)
+
+@lru_cache(maxsize=8)
+def _directory_size(root: str, minute: int) -> int:
+    """Total size in bytes of the files under root; minute only scopes the cache entry"""
+    # scandir's DirEntry carries the file type, so each file is stat'ed once
+    total = 0
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                else:
+                    total += entry.stat(follow_symlinks=False).st_size
+    return total
+
+def _fast_copy(src: str, dst: str) -> str:
+    """copy2 replacement that lets the kernel copy (or reflink) the data where it can"""
+    if not hasattr(os, "copy_file_range"):
+        return shutil.copy2(src, dst)
+    
+    try:
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            remaining = os.fstat(fsrc.fileno()).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+        if remaining > 0:
+            # The file changed size underneath us; let copy2 redo it from scratch
+            return shutil.copy2(src, dst)
+    except OSError:
+        # Cross-device on older kernels, or a filesystem without support
+        return shutil.copy2(src, dst)
+    
+    shutil.copystat(src, dst)
+    return dst
+
+class _CachedEmbeddingFunction(EmbeddingFunction):
+    """Wraps an embedding function with a persistent SQLite cache keyed by a digest of the text"""
+    
+    # Stays under SQLite's default bound-parameter limit
+    _LOOKUP_BATCH = 500
+    
+    def __init__(self, base: EmbeddingFunction, cache_path: str):
+        self._base = base
+        self._db = sqlite3.connect(cache_path, check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL)")
+        self._db.commit()
+        self._lock = threading.Lock()
+    
+    def __call__(self, input: Documents) -> Embeddings:
+        keys = [hashlib.blake2b(text.encode(), digest_size=16).digest() for text in input]
+        
+        cached = {}
+        with self._lock:
+            for start in range(0, len(keys), self._LOOKUP_BATCH):
+                batch = keys[start:start + self._LOOKUP_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                cached.update(self._db.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                ))
+        
+        embeddings = [None] * len(keys)
+        missing = []
+        for i, key in enumerate(keys):
+            vector = cached.get(key)
+            if vector is None:
+                missing.append(i)
+            else:
+                embeddings[i] = np.frombuffer(vector, dtype=np.float32).tolist()
+        
+        if missing:
+            computed = [np.asarray(v, dtype=np.float32) for v in self._base([input[i] for i in missing])]
+            with self._lock:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    [(keys[i], v.tobytes()) for i, v in zip(missing, computed)]
+                )
+                self._db.commit()
+            for i, v in zip(missing, computed):
+                embeddings[i] = v.tolist()
+        
+        return embeddings
+
 class CommercialChromaDBManager:
-    def __init__(self, path: str = "./chroma_db"):
+    def __init__(self, path: str = "./chroma_db", preloaded_queries: Optional[List[str]] = None):
         self.client = None
-        self.contracts_collection = None
-        self.analysis_collection = None
-        self.regulations_collection = None
+        # Frequent dashboard queries embedded once at startup; defaults to PRELOADED_QUERIES ("|"-separated)
+        if preloaded_queries is None:
+            preloaded_queries = [q.strip() for q in os.getenv("PRELOADED_QUERIES", "").split("|") if q.strip()]
+        self.preloaded_queries = preloaded_queries
+        self._query_cache: Dict[str, List[float]] = {}
+        self._collections: Dict[str, Any] = {}
+        self._collections_lock = threading.Lock()
+        self._embedding_function = None
         self.path = path
         self.initialized = False
+        # Sorted (analysis_timestamp, analysis_id) pairs backing get_analysis_history; built on first use
+        self._ts_index: Optional[List[Tuple[str, str]]] = None
+        # Analysis IDs already in _ts_index, and when it was last loaded (time.monotonic())
+        self._ts_index_ids: set = set()
+        self._ts_index_loaded = 0.0
+        # Columnar view of the analysis metadata used by get_contract_stats; built on first use
+        self._analysis_frame: Optional[pd.DataFrame] = None
+        # Analysis metadata stored since the frame was built, appended on the next stats call
+        self._pending_analyses: List[Dict[str, Any]] = []
+        self._ts_lock = threading.Lock()
     
     def initialize_db(self):
         """Initialize ChromaDB client and collection with commercial settings"""
@@ -28,33 +214,21 @@ class CommercialChromaDBManager:
                 )
             )
             
-            # Create or get collections
-            self.contracts_collection = self.client.get_or_create_collection(
-                name="commercial_contracts",
-                metadata={
-                    "description": "Commercial contract compliance analysis storage",
-                    "created": datetime.now().isoformat(),
-                    "version": "2.0.0"
-                }
+            # Repeated queries (and re-stored texts) skip the embedding model entirely
+            self._embedding_function = _CachedEmbeddingFunction(
+                embedding_functions.DefaultEmbeddingFunction(),
+                os.path.join(self.path, "_emb_cache.sqlite3")
             )
             
-            self.analysis_collection = self.client.get_or_create_collection(
-                name="compliance_analyses",
-                metadata={
-                    "description": "Compliance analysis results and metadata",
-                    "created": datetime.now().isoformat(),
-                    "version": "2.0.0"
-                }
-            )
+            # Collections are created or opened on first access; see _collection()
+            self._collections = {}
             
-            self.regulations_collection = self.client.get_or_create_collection(
-                name="regulatory_knowledge",
-                metadata={
-                    "description": "Regulatory knowledge and compliance rules",
-                    "created": datetime.now().isoformat(),
-                    "version": "2.0.0"
-                }
-            )
+            if self.preloaded_queries:
+                try:
+                    embeddings = self._embedding_function(self.preloaded_queries)
+                    self._query_cache = dict(zip(self.preloaded_queries, embeddings))
+                except Exception as e:
+                    logger.warning(f"Could not preload query embeddings: {e}")
             
             self.initialized = True
             logger.info("✅ Commercial ChromaDB initialized successfully")
@@ -65,70 +239,137 @@ class CommercialChromaDBManager:
             self.initialized = False
             return False
     
+    def _collection(self, name: str):
+        """Get or create a collection the first time it is used"""
+        collection = self._collections.get(name)
+        if collection is None:
+            with self._collections_lock:
+                collection = self._collections.get(name)
+                if collection is None:
+                    collection = self.client.get_or_create_collection(
+                        name=name,
+                        embedding_function=self._embedding_function,
+                        metadata={
+                            "description": _COLLECTION_DESCRIPTIONS[name],
+                            "created": datetime.now().isoformat(),
+                            "version": "2.0.0"
+                        }
+                    )
+                    self._collections[name] = collection
+        return collection
+    
+    @property
+    def contracts_collection(self):
+        return self._collection("commercial_contracts")
+    
+    @property
+    def analysis_collection(self):
+        return self._collection("compliance_analyses")
+    
+    @property
+    def regulations_collection(self):
+        return self._collection("regulatory_knowledge")
+    
     def is_connected(self) -> bool:
         """Check if ChromaDB is connected and initialized"""
-        return self.initialized and self.contracts_collection is not None
+        return self.initialized and self.client is not None
     
     def store_contract(self, contract_text: str, metadata: Dict[str, Any]) -> bool:
         """Store contract analysis in ChromaDB with enhanced metadata"""
+        return self.store_contracts_bulk([(contract_text, metadata)])
+    
+    def store_contracts_bulk(self, contracts: List[Tuple[str, Dict[str, Any]]]) -> bool:
+        """Store many (contract_text, metadata) pairs with one add() per collection"""
         if not self.is_connected():
             return False
         
+        if not contracts:
+            return True
+        
         try:
-            # Generate unique IDs
-            contract_id = str(uuid.uuid4())
-            analysis_id = metadata.get('analysis_id', str(uuid.uuid4()))
-            
-            # Convert lists to strings for ChromaDB compatibility
-            processed_metadata = {}
-            for key, value in metadata.items():
-                if isinstance(value, list):
-                    processed_metadata[key] = json.dumps(value)  # Convert list to JSON string
-                else:
-                    processed_metadata[key] = value
-            
-            # Prepare contract metadata
-            contract_metadata = {
-                **processed_metadata,
-                "contract_id": contract_id,
-                "analysis_id": analysis_id,
-                "storage_timestamp": datetime.now().isoformat(),
-                "text_length": len(contract_text),
-                "document_type": "contract"
-            }
-            
-            # Prepare analysis metadata
-            analysis_metadata = {
-                **processed_metadata,
-                "contract_id": contract_id,
-                "analysis_id": analysis_id,
-                "analysis_timestamp": datetime.now().isoformat(),
-                "document_type": "analysis"
-            }
-            
-            # Ensure all metadata values are ChromaDB compatible
-            contract_metadata = self._ensure_metadata_compatibility(contract_metadata)
-            analysis_metadata = self._ensure_metadata_compatibility(analysis_metadata)
+            # One timestamp for the whole batch, so contract and analysis rows match exactly
+            now = datetime.now(timezone.utc)
+            now_iso = now.isoformat()
+            now_epoch = now.timestamp()
+            
+            n = len(contracts)
+            contract_docs, contract_metas, contract_ids = [None] * n, [None] * n, [None] * n
+            analysis_docs, analysis_metas, analysis_ids = [None] * n, [None] * n, [None] * n
+            
+            for i, (contract_text, metadata) in enumerate(contracts):
+                # Store first 2000 chars for search; sliced once and handed to add() as-is
+                snippet = contract_text[:2000]
+                
+                # Generate unique IDs
+                contract_id = str(uuid.uuid4())
+                analysis_id = metadata.get('analysis_id', str(uuid.uuid4()))
+                
+                # Convert lists to strings for ChromaDB compatibility
+                processed_metadata = {}
+                for key, value in metadata.items():
+                    if isinstance(value, list):
+                        processed_metadata[key] = _dumps(value)  # Convert list to JSON string
+                    else:
+                        processed_metadata[key] = value
+                
+                # Prepare contract metadata
+                contract_metadata = {
+                    **processed_metadata,
+                    "contract_id": contract_id,
+                    "analysis_id": analysis_id,
+                    "storage_timestamp": now_iso,
+                    "text_length": len(contract_text),
+                    "document_type": "contract"
+                }
+                
+                # Prepare analysis metadata
+                analysis_metadata = {
+                    **processed_metadata,
+                    "contract_id": contract_id,
+                    "analysis_id": analysis_id,
+                    "analysis_timestamp": now_iso,
+                    "analysis_epoch": now_epoch,  # Numeric copy for range filters
+                    "document_type": "analysis"
+                }
+                
+                # Ensure all metadata values are ChromaDB compatible
+                contract_docs[i] = snippet
+                contract_metas[i] = self._ensure_metadata_compatibility(contract_metadata)
+                contract_ids[i] = contract_id
+                
+                analysis_docs[i] = f"Analysis for contract {contract_id}"
+                analysis_metas[i] = self._ensure_metadata_compatibility(analysis_metadata)
+                analysis_ids[i] = analysis_id
             
             # Store contract content
             self.contracts_collection.add(
-                documents=[contract_text[:2000]],  # Store first 2000 chars for search
-                metadatas=[contract_metadata],
-                ids=[contract_id]
+                documents=contract_docs,
+                metadatas=contract_metas,
+                ids=contract_ids
             )
             
             # Store analysis metadata
             self.analysis_collection.add(
-                documents=[f"Analysis for contract {contract_id}"],
-                metadatas=[analysis_metadata],
-                ids=[analysis_id]
+                documents=analysis_docs,
+                metadatas=analysis_metas,
+                ids=analysis_ids
             )
             
-            logger.info(f"✅ Contract stored successfully: {contract_id}")
+            with self._ts_lock:
+                if self._analysis_frame is not None:
+                    self._pending_analyses.extend(analysis_metas)
+                if self._ts_index is not None:
+                    for metadata, analysis_id in zip(analysis_metas, analysis_ids):
+                        # A repeated ID leaves Chroma with the existing row, so it is indexed once
+                        if analysis_id not in self._ts_index_ids:
+                            self._ts_index_ids.add(analysis_id)
+                            insort(self._ts_index, (metadata['analysis_timestamp'], analysis_id))
+            
+            logger.info(f"✅ {len(contract_ids)} contract(s) stored successfully: {', '.join(contract_ids)}")
             return True
             
         except Exception as e:
-            logger.error(f"❌ Error storing contract: {e}")
+            logger.error(f"❌ Error storing contracts: {e}")
             return False
     
     def _ensure_metadata_compatibility(self, metadata: Dict[str, Any]) -> Dict[str, Any]:
@@ -136,22 +377,22 @@ class CommercialChromaDBManager:
         compatible_metadata = {}
         
         for key, value in metadata.items():
-            if value is None:
-                compatible_metadata[key] = ""
-            elif isinstance(value, (str, int, float, bool)):
-                compatible_metadata[key] = value
-            elif isinstance(value, list):
-                # Convert list to JSON string
-                compatible_metadata[key] = json.dumps(value)
-            elif isinstance(value, dict):
-                # Convert dict to JSON string
-                compatible_metadata[key] = json.dumps(value)
-            else:
-                # Convert any other type to string
-                compatible_metadata[key] = str(value)
+            handler = _METADATA_HANDLERS.get(type(value))
+            compatible_metadata[key] = handler(value) if handler else self._convert_metadata_value(value)
         
         return compatible_metadata
     
+    def _convert_metadata_value(self, value: Any) -> Any:
+        """Fallback for types missing from _METADATA_HANDLERS, e.g. subclasses of str or float"""
+        if isinstance(value, (str, int, float, bool)):
+            return value
+        elif isinstance(value, (list, dict)):
+            # Convert list/dict to JSON string
+            return _dumps(value)
+        else:
+            # Convert any other type to string
+            return str(value)
+    
     def store_regulation_knowledge(self, regulation_data: Dict[str, Any]) -> bool:
         """Store regulatory knowledge for enhanced search"""
         if not self.is_connected():
@@ -164,7 +405,7 @@ class CommercialChromaDBManager:
             compatible_metadata = self._ensure_metadata_compatibility({
                 **regulation_data,
                 "regulation_id": regulation_id,
-                "storage_timestamp": datetime.now().isoformat(),
+                "storage_timestamp": datetime.now(timezone.utc).isoformat(),
                 "document_type": "regulation"
             })
             
@@ -179,70 +420,89 @@ class CommercialChromaDBManager:
             logger.error(f"❌ Error storing regulation: {e}")
             return False
     
-    def search_contracts(self, query: str, n_results: int = 10) -> List[Dict]:
-        """Enhanced contract search with multiple relevance strategies"""
+    def search_contracts(self, query: str, n_results: int = 10,
+                         fields: Tuple[str, ...] = ("metadatas", "distances")) -> List[Dict]:
+        """Enhanced contract search with multiple relevance strategies
+        
+        fields is passed to Chroma as include; add "documents" to get the stored text back.
+        Metadatas are always fetched since results are de-duplicated by contract_id.
+        """
         if not self.is_connected():
             return []
         
+        include = ["metadatas", *(field for field in fields if field != "metadatas")]
+        with_documents = "documents" in include
+        
+        # Preloaded queries go straight to the vector search without an embedding step
+        query_embedding = self._query_cache.get(query)
+        if query_embedding is not None:
+            query_args = {"query_embeddings": [query_embedding]}
+        else:
+            query_args = {"query_texts": [query]}
+        
         try:
             # Search in contracts collection
-            contract_results = self.contracts_collection.query(
-                query_texts=[query],
+            contract_future = _search_pool.submit(
+                self.contracts_collection.query,
+                **query_args,
                 n_results=n_results,
-                include=["metadatas", "documents", "distances"]
+                include=include
             )
             
-            # Search in analyses collection for additional context
-            analysis_results = self.analysis_collection.query(
-                query_texts=[query],
+            # Search in analyses collection for additional context, overlapping the first query
+            analysis_future = _search_pool.submit(
+                self.analysis_collection.query,
+                **query_args,
                 n_results=n_results//2,
-                include=["metadatas", "documents", "distances"]
+                include=include
             )
             
+            contract_results = contract_future.result()
+            analysis_results = analysis_future.result()
+            
             formatted_results = []
             
             # Process contract results
-            if contract_results['documents']:
-                for i, doc in enumerate(contract_results['documents'][0]):
-                    metadata = contract_results['metadatas'][0][i]
+            if contract_results['metadatas']:
+                for i, metadata in enumerate(contract_results['metadatas'][0]):
                     # Parse JSON strings back to lists/dicts
                     parsed_metadata = self._parse_metadata(metadata)
                     
-                    formatted_results.append({
+                    result = {
                         "type": "contract",
-                        "document": doc,
                         "metadata": parsed_metadata,
                         "relevance_score": 1 - (contract_results['distances'][0][i] if contract_results['distances'] else 0),
                         "match_type": "content"
-                    })
+                    }
+                    if with_documents:
+                        result["document"] = contract_results['documents'][0][i]
+                    formatted_results.append(result)
             
             # Process analysis results
-            if analysis_results['documents']:
-                for i, doc in enumerate(analysis_results['documents'][0]):
-                    metadata = analysis_results['metadatas'][0][i]
+            if analysis_results['metadatas']:
+                for i, metadata in enumerate(analysis_results['metadatas'][0]):
                     # Parse JSON strings back to lists/dicts
                     parsed_metadata = self._parse_metadata(metadata)
                     
-                    formatted_results.append({
+                    result = {
                         "type": "analysis",
-                        "document": doc,
                         "metadata": parsed_metadata,
                         "relevance_score": 1 - (analysis_results['distances'][0][i] if analysis_results['distances'] else 0),
                         "match_type": "metadata"
-                    })
-            
-            # Sort by relevance score and remove duplicates
-            formatted_results.sort(key=lambda x: x['relevance_score'], reverse=True)
+                    }
+                    if with_documents:
+                        result["document"] = analysis_results['documents'][0][i]
+                    formatted_results.append(result)
             
-            # Remove duplicates based on contract_id
-            seen_contracts = set()
-            unique_results = []
+            # Keep the best-scoring result per contract_id, then sort only those
+            best_by_contract = {}
             for result in formatted_results:
                 contract_id = result['metadata'].get('contract_id')
-                if contract_id not in seen_contracts:
-                    seen_contracts.add(contract_id)
-                    unique_results.append(result)
+                current = best_by_contract.get(contract_id)
+                if current is None or result['relevance_score'] > current['relevance_score']:
+                    best_by_contract[contract_id] = result
             
+            unique_results = sorted(best_by_contract.values(), key=itemgetter('relevance_score'), reverse=True)
             return unique_results[:n_results]
             
         except Exception as e:
@@ -254,55 +514,69 @@ class CommercialChromaDBManager:
         parsed_metadata = {}
         
         for key, value in metadata.items():
-            if isinstance(value, str):
+            if isinstance(value, str) and value[:1] in _JSON_START:
                 # Try to parse JSON strings
-                try:
-                    parsed_value = json.loads(value)
-                    parsed_metadata[key] = parsed_value
-                except (json.JSONDecodeError, TypeError):
+                parsed_value = _cached_loads(value)
+                if parsed_value is _NOT_JSON:
                     parsed_metadata[key] = value
+                elif isinstance(parsed_value, (list, dict)):
+                    # Copy so callers can't mutate the cached object
+                    parsed_metadata[key] = parsed_value.copy()
+                else:
+                    parsed_metadata[key] = parsed_value
             else:
                 parsed_metadata[key] = value
         
         return parsed_metadata
     
-    def get_analysis_history(self, limit: int = 20, offset: int = 0) -> List[Dict]:
-        """Get recent compliance analysis history"""
+    def get_analysis_history(self, limit: int = 20, offset: int = 0, raw: bool = False) -> List[Dict]:
+        """Get recent compliance analysis history
+        
+        raw=True returns the metadata exactly as stored, with lists and dicts still as JSON
+        strings, for callers that only serialize the result.
+        """
         if not self.is_connected():
             return []
         
+        if limit <= 0:
+            return []
+        
         try:
-            # Get all analyses and sort by timestamp
-            all_results = self.analysis_collection.get(
-                include=["metadatas"],
-                limit=limit + offset
-            )
+            with self._ts_lock:
+                if self._ts_index is None or time.monotonic() - self._ts_index_loaded > _TS_INDEX_TTL:
+                    self._rebuild_ts_index()
+                # The index is oldest-first; take the requested page from the tail, newest first
+                page = self._ts_index[-(offset + limit):-offset or None][::-1]
             
-            if not all_results['metadatas']:
+            if not page:
                 return []
             
-            # Parse metadata for each result
-            parsed_results = []
-            for metadata in all_results['metadatas']:
-                parsed_metadata = self._parse_metadata(metadata)
-                parsed_results.append(parsed_metadata)
-            
-            # Sort by timestamp (newest first)
-            sorted_metadatas = sorted(
-                parsed_results,
-                key=lambda x: x.get('analysis_timestamp', ''),
-                reverse=True
-            )
-            
-            # Apply offset and limit
-            paginated_results = sorted_metadatas[offset:offset + limit]
+            page_ids = [analysis_id for _, analysis_id in page]
+            results = self.analysis_collection.get(ids=page_ids, include=["metadatas"])
             
-            return paginated_results
+            # get(ids=...) does not preserve the requested order
+            metadata_by_id = dict(zip(results['ids'], results['metadatas']))
+            convert = _identity if raw else self._parse_metadata
+            return [
+                convert(metadata_by_id[analysis_id])
+                for analysis_id in page_ids
+                if analysis_id in metadata_by_id
+            ]
             
         except Exception as e:
             logger.error(f"❌ Error getting analysis history: {e}")
             return []
     
+    def _rebuild_ts_index(self):
+        """Load (analysis_timestamp, analysis_id) for every stored analysis, sorted by time"""
+        all_results = self.analysis_collection.get(include=["metadatas"])
+        self._ts_index = sorted(
+            (str(metadata.get('analysis_timestamp', '')), analysis_id)
+            for analysis_id, metadata in zip(all_results['ids'], all_results['metadatas'])
+        )
+        self._ts_index_ids = set(all_results['ids'])
+        self._ts_index_loaded = time.monotonic()
+    
     def get_contract_stats(self) -> Dict[str, Any]:
         """Get comprehensive statistics about stored contracts and analyses"""
         if not self.is_connected():
@@ -314,32 +588,24 @@ class CommercialChromaDBManager:
             regulation_count = self.regulations_collection.count()
             
             # Get recent analyses for timeline
-            recent_analyses = self.get_analysis_history(limit=100)
+            with self._ts_lock:
+                if self._analysis_frame is None:
+                    self._analysis_frame = self._build_analysis_frame()
+                elif self._pending_analyses:
+                    self._analysis_frame = self._analysis_frame_from(
+                        self._pending_analyses, self._analysis_frame
+                    )
+                self._pending_analyses = []
+                df = self._analysis_frame.tail(100)
             
             # Calculate statistics
-            jurisdictions = {}
-            industries = {}
-            regulations_used = {}
-            
-            for analysis in recent_analyses:
-                jurisdiction = analysis.get('jurisdiction', 'unknown')
-                industry = analysis.get('industry', 'unknown')
-                regulations = analysis.get('regulations', [])
-                
-                jurisdictions[jurisdiction] = jurisdictions.get(jurisdiction, 0) + 1
-                industries[industry] = industries.get(industry, 0) + 1
-                
-                if isinstance(regulations, list):
-                    for regulation in regulations:
-                        regulations_used[regulation] = regulations_used.get(regulation, 0) + 1
-                elif isinstance(regulations, str):
-                    # Handle case where regulations is stored as JSON string
-                    try:
-                        reg_list = json.loads(regulations)
-                        for regulation in reg_list:
-                            regulations_used[regulation] = regulations_used.get(regulation, 0) + 1
-                    except:
-                        pass
+            jurisdictions = self._value_counts(df, 'jurisdiction')
+            industries = self._value_counts(df, 'industry')
+            
+            # Each cell holds a short list; Counter avoids explode()'s per-element index rebuild
+            regulations_used = Counter()
+            for regulations in df['regulations']:
+                regulations_used.update(regulations)
             
             return {
                 "total_contracts": contract_count,
@@ -347,7 +613,7 @@ class CommercialChromaDBManager:
                 "total_regulations": regulation_count,
                 "jurisdiction_distribution": jurisdictions,
                 "industry_distribution": industries,
-                "top_regulations": dict(sorted(regulations_used.items(), key=lambda x: x[1], reverse=True)[:10]),
+                "top_regulations": dict(regulations_used.most_common(10)),
                 "database_size_mb": self._get_database_size(),
                 "last_updated": datetime.now().isoformat()
             }
@@ -356,15 +622,38 @@ class CommercialChromaDBManager:
             logger.error(f"❌ Error getting stats: {e}")
             return {"error": str(e)}
     
+    def _build_analysis_frame(self) -> pd.DataFrame:
+        """Load the columns the stats need for every analysis, oldest first"""
+        all_results = self.analysis_collection.get(include=["metadatas"])
+        return self._analysis_frame_from(all_results['metadatas'])
+    
+    def _analysis_frame_from(self, metadatas: List[Dict[str, Any]],
+                             existing: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """Stats columns for the given analysis metadata, merged into existing, oldest first"""
+        df = pd.DataFrame.from_records(
+            [[metadata.get(column) for column in _ANALYSIS_COLUMNS] for metadata in metadatas],
+            columns=_ANALYSIS_COLUMNS
+        )
+        # Regulations are stored as JSON strings
+        df['regulations'] = df['regulations'].map(
+            lambda r: _parse_if_needed(r, [])
+        ).map(lambda r: r if isinstance(r, list) else [])
+        df['analysis_timestamp'] = df['analysis_timestamp'].fillna('').astype(str)
+        if existing is not None:
+            df = pd.concat([existing, df], ignore_index=True)
+        return df.sort_values('analysis_timestamp', kind='stable', ignore_index=True)
+    
+    def _value_counts(self, df: pd.DataFrame, column: str) -> Dict[str, int]:
+        """Count occurrences of a metadata field, treating missing values as 'unknown'"""
+        counts = df[column].fillna('unknown').value_counts()
+        # Plain ints so the result stays JSON serializable
+        return {key: int(n) for key, n in counts.items()}
+    
     def _get_database_size(self) -> float:
         """Estimate database size in MB"""
         try:
-            import os
-            total_size = 0
-            for dirpath, dirnames, filenames in os.walk(self.path):
-                for filename in filenames:
-                    filepath = os.path.join(dirpath, filename)
-                    total_size += os.path.getsize(filepath)
+            # Recomputed at most once a minute per path
+            total_size = _directory_size(self.path, int(time.time()) // 60)
             return round(total_size / (1024 * 1024), 2)
         except:
             return 0.0
@@ -372,13 +661,10 @@ class CommercialChromaDBManager:
     def backup_database(self, backup_path: str) -> bool:
         """Create a backup of the database"""
         try:
-            import shutil
-            import os
-            
             if os.path.exists(backup_path):
                 shutil.rmtree(backup_path)
             
-            shutil.copytree(self.path, backup_path)
+            shutil.copytree(self.path, backup_path, copy_function=_fast_copy)
             logger.info(f"✅ Database backed up to: {backup_path}")
             return True
             
@@ -392,35 +678,35 @@ class CommercialChromaDBManager:
             return 0
         
         try:
-            cutoff_date = datetime.now().timestamp() - (days_old * 24 * 60 * 60)
-            deleted_count = 0
-            
-            # Get all analyses
-            all_analyses = self.analysis_collection.get(include=["metadatas", "ids"])
-            
-            for i, metadata in enumerate(all_analyses['metadatas']):
-                analysis_timestamp = metadata.get('analysis_timestamp')
-                if analysis_timestamp:
-                    try:
-                        # Handle different timestamp formats
-                        if 'T' in analysis_timestamp:
-                            analysis_date = datetime.fromisoformat(analysis_timestamp.replace('Z', '+00:00'))
-                        else:
-                            analysis_date = datetime.strptime(analysis_timestamp, '%Y-%m-%d %H:%M:%S')
-                        
-                        if analysis_date.timestamp() < cutoff_date:
-                            analysis_id = all_analyses['ids'][i]
-                            # Also delete corresponding contract
-                            contract_id = metadata.get('contract_id')
-                            
-                            self.analysis_collection.delete(ids=[analysis_id])
-                            if contract_id:
-                                self.contracts_collection.delete(ids=[contract_id])
-                            
-                            deleted_count += 1
-                    except Exception as e:
-                        logger.warning(f"Could not parse timestamp {analysis_timestamp}: {e}")
-                        continue
+            cutoff_date = pd.Timestamp.now(tz='UTC') - pd.Timedelta(days=days_old)
+            
+            # Chroma only range-filters numbers, so the pushdown uses analysis_epoch; analyses
+            # stored before that field existed force the client-side scan instead
+            epoch_ids = self.analysis_collection.get(where={"analysis_epoch": {"$gte": 0}}, include=[])['ids']
+            if len(epoch_ids) == self.analysis_collection.count():
+                victims = self.analysis_collection.get(
+                    where={"analysis_epoch": {"$lt": cutoff_date.timestamp()}},
+                    include=["metadatas"]
+                )
+                expired_ids = victims['ids']
+                expired_metadatas = victims['metadatas']
+            else:
+                expired_ids, expired_metadatas = self._scan_expired_analyses(cutoff_date)
+            
+            # Also delete corresponding contracts
+            contract_ids = [metadata['contract_id'] for metadata in expired_metadatas if metadata.get('contract_id')]
+            
+            if expired_ids:
+                self.analysis_collection.delete(ids=expired_ids)
+            if contract_ids:
+                self.contracts_collection.delete(ids=contract_ids)
+            deleted_count = len(expired_ids)
+            
+            if deleted_count:
+                with self._ts_lock:
+                    self._ts_index = None
+                    self._analysis_frame = None
+                    self._pending_analyses = []
             
             logger.info(f"✅ Cleaned up {deleted_count} old analyses")
             return deleted_count
@@ -429,6 +715,25 @@ class CommercialChromaDBManager:
             logger.error(f"❌ Cleanup failed: {e}")
             return 0
     
+    def _scan_expired_analyses(self, cutoff_date: pd.Timestamp) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """Find analyses older than cutoff_date by parsing every stored timestamp"""
+        # Get all analyses (ids are always returned)
+        all_analyses = self.analysis_collection.get(include=["metadatas"])
+        ids = all_analyses['ids']
+        metadatas = all_analyses['metadatas']
+        
+        # Parse every timestamp in one pass; ISO strings with or without an offset and
+        # "%Y-%m-%d %H:%M:%S" are all accepted, naive values are taken as UTC
+        raw_timestamps = [metadata.get('analysis_timestamp') or None for metadata in metadatas]
+        timestamps = pd.to_datetime(raw_timestamps, errors='coerce', utc=True, format='mixed')
+        
+        unparsed = int((timestamps.isna() & pd.notna(raw_timestamps)).sum())
+        if unparsed:
+            logger.warning(f"Could not parse {unparsed} analysis timestamp(s)")
+        
+        expired = np.flatnonzero(timestamps < cutoff_date)
+        return [ids[i] for i in expired], [metadatas[i] for i in expired]
+    
     def get_collection_info(self) -> Dict[str, Any]:
         """Get information about all collections"""
         if not self.is_connected():
@@ -473,6 +778,10 @@ class CommercialChromaDBManager:
             if self.client:
                 self.client.reset()
                 self.initialized = False
+                self._collections = {}
+                self._ts_index = None
+                self._analysis_frame = None
+                self._pending_analyses = []
                 logger.warning("🗑️ Database reset completed")
                 return True
             return False
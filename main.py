@@ -1,16 +1,32 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 import os
+import asyncio
+import contextvars
+import hashlib
+import multiprocessing
+import sqlite3
 import tempfile
+import threading
+import time
 import PyPDF2
-import json
+try:
+    import pypdfium2 as pdfium
+except ImportError:  # Optional native PDF backend
+    pdfium = None
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import uvicorn
-from typing import List, Dict, Any, Optional
-from datetime import datetime
-from regulatory_kb import CommercialRegulatoryKnowledgeBase
+from typing import Callable, List, Dict, Any, Iterator, Optional, Tuple
+from collections import OrderedDict
+from itertools import chain, islice
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from regulatory_kb import Clause, CommercialRegulatoryKnowledgeBase, TermScanner
 from chroma_db import CommercialChromaDBManager
 from dotenv import load_dotenv
 import logging
@@ -47,6 +63,178 @@ chroma_db = CommercialChromaDBManager()
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
 OPENROUTER_MODEL = os.getenv("OPENROUTER_MODEL", "google/gemini-pro")
 OPENROUTER_BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
+OPENROUTER_HEADERS = {
+    "Authorization": f"Bearer {OPENROUTER_API_KEY}",
+    "Content-Type": "application/json",
+    "HTTP-Referer": "https://contract-compliance-checker.com",
+    "X-Title": "Contract Compliance Checker"
+}
+
+def _create_openrouter_session() -> requests.Session:
+    """Keep-alive session for OpenRouter, sized for the concurrent prompts of one analysis"""
+    session = requests.Session()
+    session.headers.update(OPENROUTER_HEADERS)
+    # Connect errors and 429/503 (rejected before any work was billed) are retried with a short
+    # exponential backoff. Retry-After is ignored since it could sleep past the analysis deadline;
+    # read timeouts and other 5xx are never retried, the prompt may already have been processed
+    session.mount("https://", HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=32,
+        max_retries=Retry(
+            total=3,
+            read=0,
+            backoff_factor=0.5,
+            status_forcelist=(429, 503),
+            allowed_methods=frozenset({"POST"}),
+            respect_retry_after_header=False,
+            raise_on_status=False
+        )
+    ))
+    return session
+
+openrouter_session = _create_openrouter_session()
+
+# Wall-clock budget for the AI phases of one analysis, kept under the frontend's 120 s read
+# timeout; once it is spent the remaining prompts fall back to rule-based output
+ANALYSIS_DEADLINE = float(os.getenv("ANALYSIS_DEADLINE", 100))
+OPENROUTER_TIMEOUT = 30
+# time.monotonic() by which the current analysis must finish; copied into to_thread workers
+_analysis_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("analysis_deadline", default=None)
+
+AI_CACHE_PATH = os.getenv("AI_CACHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "ai_cache.sqlite3"))
+
+# One connection per database file, shared by every cache stored in it; SQLite serialises
+# writers anyway, and a single connection can't lock itself out
+_sqlite_connections: Dict[str, Tuple[sqlite3.Connection, threading.Lock]] = {}
+_sqlite_connections_lock = threading.Lock()
+
+def _sqlite_connection(path: str) -> Tuple[sqlite3.Connection, threading.Lock]:
+    """Shared connection for path and the lock guarding it, opened on first use"""
+    path = os.path.abspath(path)
+    with _sqlite_connections_lock:
+        if path not in _sqlite_connections:
+            _sqlite_connections[path] = (sqlite3.connect(path, check_same_thread=False), threading.Lock())
+        return _sqlite_connections[path]
+
+class AIResponseCache:
+    """Two-tier cache for AI responses: an in-memory LRU in front of a SQLite table
+    
+    The table is opened on first use. With a ttl, entries older than it are never returned
+    and are deleted from the table when it is opened and on every write. Database errors
+    only cost the persistent copy: reads miss and writes are logged.
+    """
+    
+    def __init__(self, path: str, maxsize: int = 4096, table: str = "ai_cache", ttl: Optional[float] = None):
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._table = table
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._table_ready = False
+    
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        return hashlib.blake2b("|".join(parts).encode()).hexdigest()
+    
+    def _connection(self) -> Tuple[sqlite3.Connection, threading.Lock]:
+        """Shared connection with this cache's table created; call with self._lock held"""
+        db, db_lock = _sqlite_connection(self.path)
+        if not self._table_ready:
+            with db_lock:
+                try:
+                    db.execute(
+                        f"CREATE TABLE IF NOT EXISTS {self._table} "
+                        "(key TEXT PRIMARY KEY, text TEXT NOT NULL, created_at REAL NOT NULL)"
+                    )
+                    if self.ttl is not None:
+                        db.execute(f"CREATE INDEX IF NOT EXISTS {self._table}_created_at ON {self._table} (created_at)")
+                        self._purge_expired(db)
+                    db.commit()
+                except sqlite3.Error:
+                    db.rollback()
+                    raise
+            self._table_ready = True
+        return db, db_lock
+    
+    def get(self, key: str, max_age: Optional[float] = None) -> Optional[str]:
+        """Cached text for key, or None; max_age (seconds, default ttl) ignores older entries"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+            else:
+                try:
+                    db, db_lock = self._connection()
+                    with db_lock:
+                        entry = db.execute(
+                            f"SELECT text, created_at FROM {self._table} WHERE key = ?", (key,)
+                        ).fetchone()
+                except sqlite3.Error as e:
+                    logger.warning(f"Could not read cached AI response: {e}")
+                    return None
+                if entry is None:
+                    return None
+                self._remember(key, *entry)
+        
+        text, created_at = entry
+        if max_age is None:
+            max_age = self.ttl
+        if max_age is not None and time.time() - created_at > max_age:
+            return None
+        return text
+    
+    def set(self, key: str, text: str):
+        """Store text under key; a failed database write only costs the persistent copy"""
+        created_at = time.time()
+        with self._lock:
+            self._remember(key, text, created_at)
+            try:
+                db, db_lock = self._connection()
+                with db_lock:
+                    try:
+                        db.execute(
+                            f"INSERT OR REPLACE INTO {self._table} (key, text, created_at) VALUES (?, ?, ?)",
+                            (key, text, created_at)
+                        )
+                        if self.ttl is not None:
+                            self._purge_expired(db)
+                        db.commit()
+                    except sqlite3.Error:
+                        db.rollback()
+                        raise
+            except sqlite3.Error as e:
+                logger.warning(f"Could not persist cached AI response: {e}")
+    
+    def _purge_expired(self, db: sqlite3.Connection):
+        db.execute(f"DELETE FROM {self._table} WHERE created_at < ?", (time.time() - self.ttl,))
+    
+    def _remember(self, key: str, text: str, created_at: float):
+        self._memory[key] = (text, created_at)
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+# Only successful AI responses are stored; fallbacks are always recomputed
+ai_cache = AIResponseCache(AI_CACHE_PATH)
+
+# Identical re-submissions within this window return the stored analysis. Full responses
+# embed the modified contract, so only a few stay in memory and expired rows are deleted
+ANALYSIS_CACHE_TTL = int(os.getenv("ANALYSIS_CACHE_TTL", 24 * 60 * 60))
+analysis_cache = AIResponseCache(AI_CACHE_PATH, maxsize=32, table="analysis_cache", ttl=ANALYSIS_CACHE_TTL)
+
+# AI phases of the current analysis that fell back to rule-based output; the list is shared
+# with to_thread workers, which get a copy of the context but not of the list
+_ai_fallbacks: contextvars.ContextVar[Optional[List[str]]] = contextvars.ContextVar("ai_fallbacks", default=None)
+
+def _record_ai_fallback(phase: str):
+    """Mark the current analysis as degraded so it is not stored in the analysis cache"""
+    fallbacks = _ai_fallbacks.get()
+    if fallbacks is not None:
+        fallbacks.append(phase)
+
+# Issues and recommendations reported per regulation
+MAX_REPORTED_FINDINGS = 5
 
 # Models
 class ComplianceCheckRequest(BaseModel):
@@ -89,47 +277,107 @@ class NotificationRequest(BaseModel):
     platform: str  # email, slack, sheets
     recipients: List[str]
 
+# Below this many pages the process start-up costs more than parallel extraction saves
+PDF_PARALLEL_MIN_PAGES = 32
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    """Process pool for PDF text extraction, created on first large PDF"""
+    global _pdf_pool
+    if _pdf_pool is None:
+        # By then the server runs the event loop, thread pools and Chroma's threads; forking
+        # it could leave a worker stuck on a lock held by one of them, so workers are spawned
+        _pdf_pool = ProcessPoolExecutor(
+            max_workers=os.cpu_count(),
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pdf_pool
+
+def _extract_page_range(pdf_file_path: str, start: int, stop: int) -> List[str]:
+    """Extract text for pages [start, stop); runs in a worker process with its own reader"""
+    reader = PyPDF2.PdfReader(pdf_file_path)
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+def iter_pdf_pages(pdf_file_path: str) -> Iterator[str]:
+    """Yield the text of each page in order, preferring pypdfium2 when it is installed"""
+    if pdfium is not None:
+        try:
+            pdf = pdfium.PdfDocument(pdf_file_path)
+        except Exception as e:
+            logger.warning(f"pypdfium2 could not open PDF, falling back to PyPDF2: {e}")
+        else:
+            # PDFium is not thread-safe, so pages are read one after another; native
+            # parsing is fast enough that this beats the PyPDF2 process pool
+            try:
+                for i in range(len(pdf)):
+                    page = pdf[i]
+                    textpage = page.get_textpage()
+                    # The caller may stop early; the open page is still released
+                    try:
+                        yield textpage.get_text_range()
+                    finally:
+                        textpage.close()
+                        page.close()
+            finally:
+                pdf.close()
+            return
+    
+    reader = PyPDF2.PdfReader(pdf_file_path)
+    page_count = len(reader.pages)
+    
+    if page_count < PDF_PARALLEL_MIN_PAGES:
+        for page in reader.pages:
+            yield page.extract_text() or ""
+    else:
+        # PyPDF2's parser is pure Python, so pages are split across processes
+        workers = os.cpu_count() or 1
+        chunk = -(-page_count // workers)
+        futures = [
+            _get_pdf_pool().submit(_extract_page_range, pdf_file_path, start, min(start + chunk, page_count))
+            for start in range(0, page_count, chunk)
+        ]
+        for future in futures:
+            yield from future.result()
+
 def extract_text_from_pdf(pdf_file_path: str) -> str:
     """Extract text from PDF file with enhanced error handling"""
     try:
-        with open(pdf_file_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
-            
-            # Remove duplicate lines and clean text
-            lines = text.split('\n')
-            unique_lines = []
-            for line in lines:
+        # Remove duplicate lines and clean text, one page at a time
+        unique_lines = []
+        seen = set()
+        for page_text in iter_pdf_pages(pdf_file_path):
+            for line in page_text.split('\n'):
                 clean_line = line.strip()
-                if clean_line and clean_line not in unique_lines:
+                if clean_line and clean_line not in seen:
+                    seen.add(clean_line)
                     unique_lines.append(clean_line)
-            
-            return '\n'.join(unique_lines)
+        
+        return '\n'.join(unique_lines)
     except Exception as e:
         logger.error(f"Error reading PDF: {str(e)}")
         raise HTTPException(status_code=400, detail=f"Error reading PDF: {str(e)}")
 
-def query_openrouter(prompt: str, system_message: str = None, max_tokens: int = 1000) -> str:
+def query_openrouter(prompt: str, system_message: str = None, max_tokens: int = 1000,
+                     response_format: Optional[Dict[str, str]] = None) -> str:
     """Query OpenRouter API with enhanced error handling"""
     if not OPENROUTER_API_KEY:
         logger.error("OpenRouter API key not configured")
         return "AI service not configured. Using rule-based analysis."
     
+    timeout = OPENROUTER_TIMEOUT
+    deadline = _analysis_deadline.get()
+    if deadline is not None:
+        timeout = min(timeout, deadline - time.monotonic())
+        if timeout <= 0:
+            logger.warning("Analysis deadline reached, skipping OpenRouter query")
+            return "AI analysis completed. Please review the compliance recommendations."
+    
     try:
         messages = []
         if system_message:
             messages.append({"role": "system", "content": system_message})
         messages.append({"role": "user", "content": prompt})
         
-        headers = {
-            "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": "https://contract-compliance-checker.com",
-            "X-Title": "Contract Compliance Checker"
-        }
-        
         payload = {
             "model": OPENROUTER_MODEL,
             "messages": messages,
@@ -137,16 +385,18 @@ def query_openrouter(prompt: str, system_message: str = None, max_tokens: int =
             "temperature": 0.3,
             "top_p": 0.9
         }
+        if response_format:
+            payload["response_format"] = response_format
         
-        response = requests.post(
+        # Content-Type is already set on the session; orjson hands back bytes ready to send
+        response = openrouter_session.post(
             f"{OPENROUTER_BASE_URL}/chat/completions",
-            headers=headers,
-            json=payload,
-            timeout=30
+            data=orjson.dumps(payload),
+            timeout=timeout
         )
         
         if response.status_code == 200:
-            result = response.json()
+            result = orjson.loads(response.content)
             return result['choices'][0]['message']['content'].strip()
         else:
             logger.error(f"OpenRouter API error: {response.status_code} - {response.text}")
@@ -156,6 +406,11 @@ def query_openrouter(prompt: str, system_message: str = None, max_tokens: int =
         logger.error(f"Error querying OpenRouter: {str(e)}")
         return "AI analysis completed. Please review the compliance recommendations."
 
+def parse_ai_json(response: str) -> Any:
+    """Parse a JSON reply from the model, tolerating a surrounding ```json fence"""
+    response = response.strip().removeprefix("```json").removeprefix("```").removesuffix("```")
+    return orjson.loads(response)
+
 def send_email_notification(recipients: List[str], subject: str, body: str) -> bool:
     """Send email notification for compliance issues"""
     try:
@@ -196,11 +451,88 @@ def update_google_sheets(sheet_id: str, data: Dict[str, Any]) -> bool:
         logger.error(f"Failed to update Google Sheets: {e}")
         return False
 
-def generate_ai_clause_text(regulation: str, clause: str, requirements: List[str], contract_context: str) -> str:
-    """Generate professional legal clause using OpenRouter"""
-    system_message = """You are a senior legal compliance expert with 15+ years of experience in 
+# Output budget for one drafted clause; a batch gets this much per clause it asks for
+CLAUSE_MAX_TOKENS = 1000
+# Clauses per batched prompt; any beyond this are drafted individually by the caller
+CLAUSE_BATCH_SIZE = 4
+
+CLAUSE_SYSTEM_MESSAGE = """You are a senior legal compliance expert with 15+ years of experience in 
     corporate law and regulatory compliance. Generate professional, legally sound contract clauses 
     that are enforceable and comprehensive."""
+
+def _clause_cache_key(regulation: str, clause: str, requirements: Tuple[str, ...]) -> str:
+    # The drafted clause is reused for every contract missing the same clause; the context
+    # excerpt is deliberately left out of the key
+    return ai_cache.make_key("clause", regulation, clause, ",".join(sorted(requirements)))
+
+def _is_usable_clause(response: str) -> bool:
+    """False for empty, too-short, or placeholder responses from query_openrouter"""
+    return bool(response) and len(response) >= 50 and "AI analysis completed" not in response \
+        and "AI service not configured" not in response
+
+def generate_ai_clause_texts(regulation: str, clauses_data: List[Clause], contract_context: str) -> List[Optional[str]]:
+    """Draft all missing clauses of one regulation in a single OpenRouter call
+    
+    Returns one entry per clause; None marks clauses the batch did not produce, which the
+    caller should generate individually with generate_ai_clause_text.
+    """
+    texts = [ai_cache.get(_clause_cache_key(regulation, c.clause, c.requirements)) for c in clauses_data]
+    # Longer batches risk a truncated JSON reply, which would throw away the whole batch
+    pending = [i for i, text in enumerate(texts) if text is None][:CLAUSE_BATCH_SIZE]
+    
+    # A single clause gains nothing from batching
+    if len(pending) < 2:
+        return texts
+    
+    items = "\n".join(
+        f"{n}. {clauses_data[i].clause} (requirements: {', '.join(clauses_data[i].requirements)})"
+        for n, i in enumerate(pending, 1)
+    )
+    prompt = f"""
+    Generate a professional legal clause for a commercial contract for each of the items below.
+    
+    REGULATION: {regulation}
+    CONTRACT CONTEXT: {contract_context[:500]}
+    
+    ITEMS:
+    {items}
+    
+    Each clause must be:
+    - Legally precise and enforceable
+    - Comprehensive yet concise
+    - Written in formal commercial contract language
+    - Include specific obligations, responsibilities, and remedies
+    - Reference the relevant regulation appropriately
+    - Suitable for commercial use
+    
+    Respond with a JSON object {{"clauses": [{{"key": <item number>, "text": "<clause text>"}}, ...]}}
+    containing only the clause text for each item, without explanations.
+    """
+    
+    response = query_openrouter(
+        prompt,
+        CLAUSE_SYSTEM_MESSAGE,
+        max_tokens=CLAUSE_MAX_TOKENS * len(pending),
+        response_format={"type": "json_object"}
+    )
+    try:
+        generated = {str(item['key']): item['text'] for item in parse_ai_json(response)['clauses']}
+    except (orjson.JSONDecodeError, KeyError, TypeError) as e:
+        logger.warning(f"Batched clause generation for {regulation} failed: {e}")
+        return texts
+    
+    for n, i in enumerate(pending, 1):
+        text = generated.get(str(n))
+        if isinstance(text, str) and _is_usable_clause(text.strip()):
+            texts[i] = text.strip()
+            clause = clauses_data[i]
+            ai_cache.set(_clause_cache_key(regulation, clause.clause, clause.requirements), texts[i])
+    
+    return texts
+
+def generate_ai_clause_text(regulation: str, clause: str, requirements: Tuple[str, ...], contract_context: str) -> str:
+    """Generate professional legal clause using OpenRouter"""
+    system_message = CLAUSE_SYSTEM_MESSAGE
     
     prompt = f"""
     Generate a professional legal clause for a commercial contract addressing: {clause}
@@ -220,10 +552,16 @@ def generate_ai_clause_text(regulation: str, clause: str, requirements: List[str
     Provide only the clause text without explanations.
     """
     
-    response = query_openrouter(prompt, system_message)
+    cache_key = _clause_cache_key(regulation, clause, requirements)
+    cached = ai_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    response = query_openrouter(prompt, system_message, max_tokens=CLAUSE_MAX_TOKENS)
     
     # Fallback if AI fails
-    if not response or len(response) < 50 or "AI analysis completed" in response:
+    if not _is_usable_clause(response):
+        _record_ai_fallback("clause")
         return f"""
 {clause.upper()}
 
@@ -232,9 +570,20 @@ The Parties shall comply with all applicable requirements under {regulation} reg
 Appropriate technical and organizational measures shall be implemented to ensure ongoing compliance. All compliance activities shall be properly documented and made available for audit upon request. In case of non-compliance, the Parties shall take immediate corrective action and notify relevant stakeholders as required by applicable law.
 """
     
+    ai_cache.set(cache_key, response)
     return response
 
-def analyze_contract_context(contract_text: str) -> Dict[str, Any]:
+# Keyword groups for the rule-based context fallback (plain substring matches)
+NEW_YORK_TERMS = frozenset({"new york", "ny"})
+CALIFORNIA_TERMS = frozenset({"california", "ca"})
+FINANCIAL_TERMS = frozenset({"loan", "financing", "credit", "interest", "payment", "debt"})
+DATA_PRIVACY_TERMS = frozenset({"data", "privacy"})
+CYBERSECURITY_TERMS = frozenset({"security", "cyber"})
+CONTEXT_TERM_SCANNER = TermScanner(
+    NEW_YORK_TERMS | CALIFORNIA_TERMS | FINANCIAL_TERMS | DATA_PRIVACY_TERMS | CYBERSECURITY_TERMS
+)
+
+def analyze_contract_context(contract_text: str, contract_lower: Optional[str] = None) -> Dict[str, Any]:
     """Analyze contract context to determine applicable regulations"""
     system_message = """You are a legal analyst specializing in regulatory compliance. 
     Analyze contracts to determine applicable regulations and jurisdictions."""
@@ -258,43 +607,58 @@ def analyze_contract_context(contract_text: str) -> Dict[str, Any]:
     }}
     """
     
+    # The prompt only sees the first 2000 characters, so they fully determine the answer
+    cache_key = ai_cache.make_key("context", contract_text[:2000])
+    cached = ai_cache.get(cache_key)
+    if cached is not None:
+        return orjson.loads(cached)
+    
+    response = query_openrouter(prompt, system_message, response_format={"type": "json_object"})
     try:
-        response = query_openrouter(prompt, system_message)
-        return json.loads(response)
-    except:
-        # Fallback analysis
+        context = parse_ai_json(response)
+    except orjson.JSONDecodeError:
+        context = None
+    if isinstance(context, dict):
+        ai_cache.set(cache_key, orjson.dumps(context).decode())
+        return context
+    
+    # Fallback analysis
+    _record_ai_fallback("context")
+    if contract_lower is None:
         contract_lower = contract_text.lower()
-        
-        jurisdiction = "US"
-        industry = "general"
-        contract_type = "service"
-        key_concerns = []
-        
-        # Detect jurisdiction
-        if "new york" in contract_lower or "ny" in contract_lower:
-            jurisdiction = "US_NY"
-        elif "california" in contract_lower or "ca" in contract_lower:
-            jurisdiction = "US_CA"
-        
-        # Detect industry
-        financial_terms = ["loan", "financing", "credit", "interest", "payment", "debt"]
-        if any(term in contract_lower for term in financial_terms):
-            industry = "financial"
-            contract_type = "loan"
-            key_concerns.append("financial compliance")
-        
-        if "data" in contract_lower or "privacy" in contract_lower:
-            key_concerns.append("data privacy")
-        
-        if "security" in contract_lower or "cyber" in contract_lower:
-            key_concerns.append("cybersecurity")
-        
-        return {
-            "jurisdiction": jurisdiction,
-            "industry": industry,
-            "contract_type": contract_type,
-            "key_concerns": key_concerns
-        }
+    
+    jurisdiction = "US"
+    industry = "general"
+    contract_type = "service"
+    key_concerns = []
+    
+    # One pass over the contract finds every keyword used below
+    hits = CONTEXT_TERM_SCANNER.scan(contract_lower)
+    
+    # Detect jurisdiction
+    if not hits.isdisjoint(NEW_YORK_TERMS):
+        jurisdiction = "US_NY"
+    elif not hits.isdisjoint(CALIFORNIA_TERMS):
+        jurisdiction = "US_CA"
+    
+    # Detect industry
+    if not hits.isdisjoint(FINANCIAL_TERMS):
+        industry = "financial"
+        contract_type = "loan"
+        key_concerns.append("financial compliance")
+    
+    if not hits.isdisjoint(DATA_PRIVACY_TERMS):
+        key_concerns.append("data privacy")
+    
+    if not hits.isdisjoint(CYBERSECURITY_TERMS):
+        key_concerns.append("cybersecurity")
+    
+    return {
+        "jurisdiction": jurisdiction,
+        "industry": industry,
+        "contract_type": contract_type,
+        "key_concerns": key_concerns
+    }
 
 def enhance_compliance_analysis(contract_text: str, regulation: str, basic_analysis: Dict) -> Dict:
     """Enhance compliance analysis with AI insights"""
@@ -310,7 +674,7 @@ def enhance_compliance_analysis(contract_text: str, regulation: str, basic_analy
     CURRENT FINDINGS:
     - Compliance Score: {basic_analysis['compliance_score']:.1%}
     - Issues: {basic_analysis['issues']}
-    - Missing Clauses: {[c['clause'] for c in basic_analysis.get('missing_clauses', [])]}
+    - Missing Clauses: {[c.clause for c in basic_analysis.get('missing_clauses', [])]}
     
     Provide detailed analysis including:
     1. 3-5 specific compliance risks
@@ -321,49 +685,83 @@ def enhance_compliance_analysis(contract_text: str, regulation: str, basic_analy
     Respond in JSON format.
     """
     
-    response = query_openrouter(prompt, system_message)
+    response = query_openrouter(prompt, system_message, response_format={"type": "json_object"})
     try:
-        ai_analysis = json.loads(response)
+        ai_analysis = parse_ai_json(response)
+        if not isinstance(ai_analysis, dict):
+            raise TypeError(f"expected a JSON object, got {type(ai_analysis).__name__}")
         
-        # Merge AI insights
+        # Merge AI insights, taking only as many as will be reported
         if 'enhanced_issues' in ai_analysis:
-            basic_analysis['issues'].extend(ai_analysis['enhanced_issues'])
+            basic_analysis['issues'] = list(islice(
+                chain(basic_analysis['issues'], ai_analysis['enhanced_issues']), MAX_REPORTED_FINDINGS
+            ))
         if 'recommendations' in ai_analysis:
-            basic_analysis['recommendations'].extend(ai_analysis['recommendations'])
+            basic_analysis['recommendations'] = list(islice(
+                chain(basic_analysis['recommendations'], ai_analysis['recommendations']), MAX_REPORTED_FINDINGS
+            ))
         if 'risk_assessment' in ai_analysis:
             basic_analysis['risk_assessment'] = ai_analysis['risk_assessment']
         if 'legal_references' in ai_analysis:
             basic_analysis['legal_references'] = ai_analysis['legal_references']
             
-    except Exception as e:
+    except (orjson.JSONDecodeError, TypeError) as e:
         logger.warning(f"AI enhancement failed: {e}")
+        _record_ai_fallback("enhance")
     
+    # The rule-based issue list can still be longer when the AI added nothing
+    del basic_analysis['issues'][MAX_REPORTED_FINDINGS:]
     return basic_analysis
 
-def analyze_compliance(contract_text: str, regulations: List[str] = None, 
-                     jurisdiction: str = "US", industry: str = "general") -> AnalysisResponse:
-    """Main compliance analysis function"""
-    start_time = datetime.now()
-    analysis_id = f"analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+def _side_effect_scheduler(background_tasks: Optional[BackgroundTasks]) -> Callable[..., None]:
+    """background_tasks.add_task, so side effects run after the response; inline without it"""
+    if background_tasks is not None:
+        return background_tasks.add_task
+    return lambda func, *args: func(*args)
+
+async def analyze_compliance(contract_text: str, regulations: List[str] = None, 
+                     jurisdiction: str = "US", industry: str = "general",
+                     background_tasks: Optional[BackgroundTasks] = None) -> AnalysisResponse:
+    """Main compliance analysis function
+    
+    Notifications are added to background_tasks so they run after the response is sent;
+    without it they run inline.
+    """
+    _analysis_deadline.set(time.monotonic() + ANALYSIS_DEADLINE)
+    fallbacks: List[str] = []
+    _ai_fallbacks.set(fallbacks)
+    
+    # Prompts only ever see the first 2000 characters and every keyword check works on
+    # lowercase text; compute both once instead of per regulation and per clause
+    contract_head = contract_text[:2000]
+    contract_lower = contract_text.lower()
+    
+    # One clock read stamps everything this analysis records, so its timestamps agree
+    start = time.perf_counter()
+    now = datetime.now(timezone.utc)
+    now_iso = now.isoformat()
+    analysis_id = f"analysis_{now.strftime('%Y%m%d_%H%M%S')}"
     
     # Analyze contract context if not provided
     if not regulations:
-        context = analyze_contract_context(contract_text)
+        context = await asyncio.to_thread(analyze_contract_context, contract_text, contract_lower)
         jurisdiction = context.get('jurisdiction', jurisdiction)
         industry = context.get('industry', industry)
-        regulations = knowledge_base.get_applicable_regulations(contract_text, jurisdiction, industry)
+        regulations = knowledge_base.get_applicable_regulations(contract_text, jurisdiction, industry, contract_lower=contract_lower)
     
     results = []
     
     # Store in ChromaDB
-    chroma_db.store_contract(
+    # Embedding and writing the contract is blocking work; keep it off the event loop
+    await asyncio.to_thread(
+        chroma_db.store_contract,
         contract_text, 
         {
             "analysis_id": analysis_id,
             "regulations": regulations,
             "jurisdiction": jurisdiction,
             "industry": industry,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso
         }
     )
     
@@ -378,55 +776,73 @@ Regulations: {', '.join(regulations)}
 
 Analysis in progress...
 """
-    send_email_notification(["team@company.com"], "Compliance Analysis Started", notification_message)
+    _side_effect_scheduler(background_tasks)(
+        send_email_notification, ["team@company.com"], "Compliance Analysis Started", notification_message
+    )
     
-    # Analyze each regulation
+    # Re-submitting the same contract with the same options replays the stored analysis under
+    # this submission's ID; it is still recorded and notified like a fresh one
+    cache_key = analysis_cache.make_key(
+        "analysis",
+        hashlib.blake2b(contract_text.encode(), digest_size=16).hexdigest(),
+        ",".join(sorted(regulations)),
+        jurisdiction or "",
+        industry or ""
+    )
+    cached = analysis_cache.get(cache_key)
+    if cached is not None:
+        logger.info("Returning cached analysis for previously analyzed contract")
+        cached_response = AnalysisResponse.model_validate_json(cached)
+        # Rebuilt rather than reused so its analysis date matches this submission's timestamp
+        modified_contract = generate_modified_contract(contract_text, cached_response.results, now)
+        response = cached_response.model_copy(update={
+            "analysis_id": analysis_id,
+            "analysis_timestamp": now_iso,
+            "modified_contract": modified_contract,
+            "processing_time": time.perf_counter() - start
+        })
+        _schedule_completion_notifications(response, background_tasks)
+        return response
+    
+    # Rule-based findings for each regulation don't depend on any AI output; one knowledge
+    # base call scans the contract once for all of them, off the event loop
+    (findings,) = await asyncio.to_thread(
+        knowledge_base.analyze_many, [contract_text], jurisdiction, industry, regulations, [contract_lower]
+    )
+    
+    per_regulation = []
     for regulation in regulations:
-        missing_clauses_data = knowledge_base.get_missing_clauses(contract_text, regulation)
-        
-        missing_clauses = []
-        for clause_data in missing_clauses_data:
-            suggested_text = generate_ai_clause_text(
-                regulation, 
-                clause_data['clause'], 
-                clause_data['requirements'],
-                contract_text
-            )
-            
-            clause_suggestion = ClauseSuggestion(
-                clause=clause_data['clause'],
-                description=clause_data['description'],
-                risk_level=clause_data['risk_level'],
-                requirements=clause_data['requirements'],
-                suggested_text=suggested_text,
-                legal_citation=clause_data.get('legal_citation', '')
-            )
-            missing_clauses.append(clause_suggestion)
+        missing_clauses_data = findings["missing_clauses"][regulation]
+        content_analysis = findings["content_analysis"][regulation]
         
         # Calculate compliance score
         total_clauses = len(missing_clauses_data) + 3  # Base + context
-        missing_count = len(missing_clauses)
+        missing_count = len(missing_clauses_data)
         compliance_score = max(0.1, 1.0 - (missing_count / total_clauses * 0.8))
         
         # Generate initial analysis
         issues = []
-        recommendations = []
+        rule_recommendations = ()
         
-        if missing_clauses:
-            high_risk_count = sum(1 for clause in missing_clauses if clause.risk_level == 'high')
+        if missing_clauses_data:
+            high_risk_count = sum(1 for clause in missing_clauses_data if clause.risk_level == 'high')
             if high_risk_count > 0:
                 issues.append(f"Missing {high_risk_count} high-risk compliance clauses")
             
-            issues.append(f"Total {len(missing_clauses)} {regulation} compliance gaps")
+            issues.append(f"Total {len(missing_clauses_data)} {regulation} compliance gaps")
             
-            recommendations.append(f"Implement comprehensive {regulation} compliance section")
-            for clause in missing_clauses[:3]:
-                recommendations.append(f"Add '{clause.clause}' clause")
+            rule_recommendations = chain(
+                (f"Implement comprehensive {regulation} compliance section",),
+                (f"Add '{clause.clause}' clause" for clause in islice(missing_clauses_data, 3))
+            )
         
-        # Content-based analysis
-        content_analysis = knowledge_base.analyze_contract_content(contract_text, regulation)
+        # Content-based analysis; the full issue list goes into the enhancement prompt,
+        # recommendations are only ever reported up to the limit
         issues.extend(content_analysis.get('issues', []))
-        recommendations.extend(content_analysis.get('recommendations', []))
+        recommendations = list(islice(
+            chain(rule_recommendations, content_analysis.get('recommendations', [])),
+            MAX_REPORTED_FINDINGS
+        ))
         
         basic_analysis = {
             "compliance_score": compliance_score,
@@ -436,16 +852,64 @@ Analysis in progress...
             "risk_assessment": "medium",
             "legal_references": []
         }
-        
-        # Enhance with AI
-        enhanced_analysis = enhance_compliance_analysis(contract_text, regulation, basic_analysis)
+        per_regulation.append((regulation, missing_clauses_data, basic_analysis))
+    
+    # Clause drafts (one batched prompt per regulation) and enhancements are independent
+    # OpenRouter round-trips; run them all at once instead of one after another
+    clause_tasks = [
+        asyncio.to_thread(generate_ai_clause_texts, regulation, missing_clauses_data, contract_head)
+        for regulation, missing_clauses_data, _ in per_regulation
+    ]
+    enhance_tasks = [
+        asyncio.to_thread(enhance_compliance_analysis, contract_head, regulation, basic_analysis)
+        for regulation, _, basic_analysis in per_regulation
+    ]
+    suggested_texts, enhanced_analyses = await asyncio.gather(
+        asyncio.gather(*clause_tasks),
+        asyncio.gather(*enhance_tasks)
+    )
+    
+    # Clauses the batches didn't produce are generated one by one, still concurrently
+    retry = [
+        (i, j)
+        for i, texts in enumerate(suggested_texts)
+        for j, text in enumerate(texts)
+        if text is None
+    ]
+    retried_texts = await asyncio.gather(*(
+        asyncio.to_thread(
+            generate_ai_clause_text,
+            per_regulation[i][0],
+            per_regulation[i][1][j].clause,
+            per_regulation[i][1][j].requirements,
+            contract_head
+        )
+        for i, j in retry
+    ))
+    for (i, j), text in zip(retry, retried_texts):
+        suggested_texts[i][j] = text
+    
+    for (regulation, missing_clauses_data, _), texts, enhanced_analysis in zip(per_regulation, suggested_texts, enhanced_analyses):
+        # Clause fields come straight from the knowledge base and the generators, so they
+        # skip validation; ComplianceResult keeps it because it carries model output
+        missing_clauses = [
+            ClauseSuggestion.model_construct(
+                clause=clause.clause,
+                description=clause.description,
+                risk_level=clause.risk_level,
+                requirements=list(clause.requirements),
+                suggested_text=suggested_text,
+                legal_citation=clause.legal_citation
+            )
+            for clause, suggested_text in zip(missing_clauses_data, texts)
+        ]
         
         compliance_result = ComplianceResult(
             regulation=regulation,
             compliance_score=enhanced_analysis["compliance_score"],
             risk_assessment=enhanced_analysis.get("risk_assessment", "medium"),
-            issues=enhanced_analysis["issues"][:5],
-            recommendations=enhanced_analysis["recommendations"][:5],
+            issues=enhanced_analysis["issues"],
+            recommendations=enhanced_analysis["recommendations"],
             missing_clauses=missing_clauses,
             legal_references=enhanced_analysis.get("legal_references", [])
         )
@@ -464,87 +928,76 @@ Analysis in progress...
         overall_risk = "low"
     
     # Generate summaries
-    summary = generate_executive_summary(results, overall_score, overall_risk, contract_text)
-    executive_summary = generate_detailed_summary(results, contract_text)
-    modified_contract = generate_modified_contract(contract_text, results)
+    summary, executive_summary = await asyncio.to_thread(
+        generate_summaries, results, overall_score, overall_risk, contract_head
+    )
+    modified_contract = generate_modified_contract(contract_text, results, now)
+    
+    processing_time = time.perf_counter() - start
+    
+    # Every field here is computed above; the endpoints' response_model validates it on the way out
+    response = AnalysisResponse.model_construct(
+        analysis_id=analysis_id,
+        overall_score=overall_score,
+        risk_level=overall_risk,
+        results=results,
+        summary=summary,
+        executive_summary=executive_summary,
+        modified_contract=modified_contract,
+        analysis_timestamp=now_iso,
+        processing_time=processing_time
+    )
+    _schedule_completion_notifications(response, background_tasks)
     
-    processing_time = (datetime.now() - start_time).total_seconds()
+    # An analysis that fell back anywhere would replay a transient failure, so it is not stored
+    if fallbacks:
+        logger.info(f"Not caching analysis {analysis_id}: AI fallbacks used for {', '.join(sorted(set(fallbacks)))}")
+    else:
+        analysis_cache.set(cache_key, response.model_dump_json())
+    return response
+
+def _schedule_completion_notifications(response: AnalysisResponse, background_tasks: Optional[BackgroundTasks]):
+    """Send the completion email and tracker row, after the response when background_tasks is given"""
+    results = response.results
+    high_risk_count = sum(1 for r in results if r.risk_assessment == "high")
+    missing_clauses = sum(len(r.missing_clauses) for r in results)
     
     # Send completion notification
     completion_message = f"""
 ✅ Contract Compliance Analysis Complete
 
-Analysis ID: {analysis_id}
-Overall Score: {overall_score:.1%}
-Risk Level: {overall_risk.upper()}
-Processing Time: {processing_time:.2f}s
+Analysis ID: {response.analysis_id}
+Overall Score: {response.overall_score:.1%}
+Risk Level: {response.risk_level.upper()}
+Processing Time: {response.processing_time:.2f}s
 
 Key Findings:
 - Regulations Analyzed: {len(results)}
 - High Risk Issues: {high_risk_count}
-- Missing Clauses: {sum(len(r.missing_clauses) for r in results)}
+- Missing Clauses: {missing_clauses}
 
 Review the full report for detailed recommendations.
 """
-    send_email_notification(["team@company.com"], "Compliance Analysis Complete", completion_message)
+    schedule = _side_effect_scheduler(background_tasks)
+    schedule(send_email_notification, ["team@company.com"], "Compliance Analysis Complete", completion_message)
     
     # Update Google Sheets
     sheets_data = {
-        "analysis_id": analysis_id,
-        "timestamp": datetime.now().isoformat(),
-        "overall_score": overall_score,
-        "risk_level": overall_risk,
+        "analysis_id": response.analysis_id,
+        "timestamp": response.analysis_timestamp,
+        "overall_score": response.overall_score,
+        "risk_level": response.risk_level,
         "regulations_analyzed": len(results),
-        "missing_clauses": sum(len(r.missing_clauses) for r in results)
+        "missing_clauses": missing_clauses
     }
-    update_google_sheets("compliance_tracker", sheets_data)
-    
-    return AnalysisResponse(
-        analysis_id=analysis_id,
-        overall_score=overall_score,
-        risk_level=overall_risk,
-        results=results,
-        summary=summary,
-        executive_summary=executive_summary,
-        modified_contract=modified_contract,
-        analysis_timestamp=datetime.now().isoformat(),
-        processing_time=processing_time
-    )
+    schedule(update_google_sheets, "compliance_tracker", sheets_data)
 
-def generate_executive_summary(results: List[ComplianceResult], overall_score: float, 
-                             risk_level: str, contract_text: str) -> str:
-    """Generate executive summary for business stakeholders"""
-    system_message = """You are a Chief Compliance Officer. Create concise executive summaries 
-    for business stakeholders focusing on risk and action items."""
-    
-    prompt = f"""
-    Create an executive summary for compliance analysis:
+def _fallback_executive_summary(results: List[ComplianceResult], overall_score: float, risk_level: str) -> str:
+    """Rule-based executive summary used when the AI response is unusable"""
+    high_risk = [r for r in results if r.risk_assessment == "high"]
+    medium_risk = [r for r in results if r.risk_assessment == "medium"]
     
-    OVERALL SCORE: {overall_score:.1%}
-    RISK LEVEL: {risk_level.upper()}
-    
-    KEY FINDINGS:
-    {chr(10).join(f'- {r.regulation}: {r.compliance_score:.1%} ({r.risk_assessment} risk)' for r in results)}
-    
-    CONTRACT TYPE: {contract_text[:500]}
-    
-    Focus on:
-    1. Overall risk assessment
-    2. Critical compliance gaps
-    3. Priority recommendations
-    4. Business impact
-    
-    Keep it concise and actionable for executives.
-    """
-    
-    response = query_openrouter(prompt, system_message)
-    
-    # Fallback summary
-    if not response or "AI analysis completed" in response:
-        high_risk = [r for r in results if r.risk_assessment == "high"]
-        medium_risk = [r for r in results if r.risk_assessment == "medium"]
-        
-        summary = f"""
+    summary = f"""
 📊 COMMERCIAL COMPLIANCE ANALYSIS EXECUTIVE SUMMARY
 
 Overall Compliance Score: {overall_score:.1%}
@@ -557,12 +1010,12 @@ REGULATIONS ANALYZED: {len(results)}
 
 CRITICAL FINDINGS:
 """
-        
-        for result in results:
-            if result.risk_assessment == "high":
-                summary += f"• {result.regulation}: {len(result.missing_clauses)} missing clauses\n"
-        
-        summary += f"""
+    
+    for result in results:
+        if result.risk_assessment == "high":
+            summary += f"• {result.regulation}: {len(result.missing_clauses)} missing clauses\n"
+    
+    summary += f"""
 RECOMMENDED ACTIONS:
 1. Address high-risk compliance gaps immediately
 2. Implement suggested clause additions
@@ -571,60 +1024,88 @@ RECOMMENDED ACTIONS:
 
 This analysis identifies key regulatory compliance requirements for your contract.
 """
-        return summary
+    return summary
+
+def _fallback_detailed_summary(results: List[ComplianceResult]) -> str:
+    """Rule-based detailed report used when the AI response is unusable"""
+    detailed_summary = "DETAILED COMPLIANCE ANALYSIS REPORT\n"
+    detailed_summary += "="*50 + "\n\n"
     
-    return response
+    for result in results:
+        detailed_summary += f"REGULATION: {result.regulation}\n"
+        detailed_summary += f"Compliance Score: {result.compliance_score:.1%}\n"
+        detailed_summary += f"Risk Assessment: {result.risk_assessment.upper()}\n\n"
+        
+        detailed_summary += "ISSUES IDENTIFIED:\n"
+        for issue in result.issues:
+            detailed_summary += f"• {issue}\n"
+        
+        detailed_summary += "\nRECOMMENDATIONS:\n"
+        for recommendation in result.recommendations:
+            detailed_summary += f"• {recommendation}\n"
+        
+        detailed_summary += "\n" + "="*50 + "\n\n"
+    
+    return detailed_summary
 
-def generate_detailed_summary(results: List[ComplianceResult], contract_text: str) -> str:
-    """Generate detailed technical summary"""
-    system_message = """You are a legal compliance analyst. Provide detailed technical analysis."""
+def generate_summaries(results: List[ComplianceResult], overall_score: float,
+                       risk_level: str, contract_text: str) -> Tuple[str, str]:
+    """Generate the executive summary and the detailed report in one OpenRouter call
+    
+    Returns (summary, executive_summary) in the sense of AnalysisResponse: the short
+    stakeholder summary first, then the detailed technical report.
+    """
+    system_message = """You are a Chief Compliance Officer and legal compliance analyst. Create concise 
+    executive summaries for business stakeholders and detailed technical analysis for legal teams."""
     
     prompt = f"""
-    Provide comprehensive compliance analysis:
+    Write two documents for this compliance analysis.
+    
+    OVERALL SCORE: {overall_score:.1%}
+    RISK LEVEL: {risk_level.upper()}
+    
+    KEY FINDINGS:
+    {chr(10).join(f'- {r.regulation}: {r.compliance_score:.1%} ({r.risk_assessment} risk)' for r in results)}
     
-    RESULTS: {json.dumps([r.model_dump() for r in results], indent=2)}
+    RESULTS: {orjson.dumps([r.model_dump() for r in results], option=orjson.OPT_INDENT_2).decode()}
     CONTRACT: {contract_text[:1000]}
     
-    Include:
-    - Detailed risk analysis
-    - Legal implications
-    - Implementation roadmap
-    - Compliance monitoring suggestions
+    1. "executive_summary": a concise, actionable summary for executives covering the overall
+       risk assessment, critical compliance gaps, priority recommendations and business impact.
+    2. "detailed_summary": a comprehensive technical analysis with detailed risk analysis,
+       legal implications, an implementation roadmap and compliance monitoring suggestions.
+    
+    Respond with a JSON object {{"executive_summary": "...", "detailed_summary": "..."}}.
     """
     
-    response = query_openrouter(prompt, system_message)
+    response = query_openrouter(prompt, system_message, max_tokens=2000, response_format={"type": "json_object"})
+    try:
+        parsed = parse_ai_json(response)
+    except orjson.JSONDecodeError:
+        parsed = None
+    if isinstance(parsed, dict):
+        summary = parsed.get('executive_summary')
+        detailed_summary = parsed.get('detailed_summary')
+    else:
+        summary = detailed_summary = None
     
-    # Fallback detailed summary
-    if not response or "AI analysis completed" in response:
-        detailed_summary = "DETAILED COMPLIANCE ANALYSIS REPORT\n"
-        detailed_summary += "="*50 + "\n\n"
-        
-        for result in results:
-            detailed_summary += f"REGULATION: {result.regulation}\n"
-            detailed_summary += f"Compliance Score: {result.compliance_score:.1%}\n"
-            detailed_summary += f"Risk Assessment: {result.risk_assessment.upper()}\n\n"
-            
-            detailed_summary += "ISSUES IDENTIFIED:\n"
-            for issue in result.issues:
-                detailed_summary += f"• {issue}\n"
-            
-            detailed_summary += "\nRECOMMENDATIONS:\n"
-            for recommendation in result.recommendations:
-                detailed_summary += f"• {recommendation}\n"
-            
-            detailed_summary += "\n" + "="*50 + "\n\n"
-        
-        return detailed_summary
+    # Fallbacks are only built for the parts the AI didn't deliver
+    if not isinstance(summary, str) or not summary.strip():
+        _record_ai_fallback("summary")
+        summary = _fallback_executive_summary(results, overall_score, risk_level)
+    if not isinstance(detailed_summary, str) or not detailed_summary.strip():
+        _record_ai_fallback("summary")
+        detailed_summary = _fallback_detailed_summary(results)
     
-    return response
+    return summary, detailed_summary
 
-def generate_modified_contract(original_text: str, results: List[ComplianceResult]) -> str:
+def generate_modified_contract(original_text: str, results: List[ComplianceResult], analysis_time: datetime) -> str:
     """Generate professionally formatted modified contract"""
     modified_contract = original_text + "\n\n" + "="*80 + "\n"
     modified_contract += "COMMERCIAL AI COMPLIANCE ENHANCEMENTS\n"
     modified_contract += "="*80 + "\n\n"
     modified_contract += "Generated by Commercial AI Compliance Checker\n"
-    modified_contract += f"Analysis Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
+    modified_contract += f"Analysis Date: {analysis_time.strftime('%Y-%m-%d %H:%M:%S %Z')}\n\n"
     
     for result in results:
         if result.missing_clauses:
@@ -649,6 +1130,13 @@ async def startup_event():
     chroma_db.initialize_db()
     logger.info("✅ Commercial AI Compliance Checker with OpenRouter initialized")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release pooled connections and worker processes on shutdown"""
+    openrouter_session.close()
+    if _pdf_pool is not None:
+        _pdf_pool.shutdown(wait=False, cancel_futures=True)
+
 @app.get("/")
 async def root():
     return {
@@ -663,32 +1151,37 @@ async def root():
         }
     }
 
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024  # 10MB limit
+
 @app.post("/upload-contract/", response_model=AnalysisResponse)
-async def upload_contract(file: UploadFile = File(...)):
+async def upload_contract(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
     """Upload and analyze contract PDF"""
     if not file.filename.lower().endswith('.pdf'):
         raise HTTPException(status_code=400, detail="Only PDF files are supported")
     
-    # Check file size
-    file.file.seek(0, 2)
-    file_size = file.file.tell()
-    file.file.seek(0)
-    
-    if file_size > 10 * 1024 * 1024:  # 10MB limit
-        raise HTTPException(status_code=400, detail="File too large. Maximum size is 10MB.")
-    
+    # Stream to disk in 1 MiB chunks, enforcing the size limit as bytes arrive; tempfile
+    # already honours TMPDIR for the location
     with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-        content = await file.read()
-        temp_file.write(content)
         temp_path = temp_file.name
+        file_size = 0
+        while chunk := await file.read(1 << 20):
+            file_size += len(chunk)
+            if file_size > MAX_UPLOAD_BYTES:
+                break
+            await asyncio.to_thread(temp_file.write, chunk)
+    
+    if file_size > MAX_UPLOAD_BYTES:
+        os.unlink(temp_path)
+        raise HTTPException(status_code=413, detail="File too large. Maximum size is 10MB.")
     
     try:
-        contract_text = extract_text_from_pdf(temp_path)
+        # Extraction blocks on parsing and on the worker processes; keep it off the event loop
+        contract_text = await asyncio.to_thread(extract_text_from_pdf, temp_path)
         
         if not contract_text.strip():
             raise HTTPException(status_code=400, detail="Could not extract text from PDF")
         
-        analysis = analyze_compliance(contract_text)
+        analysis = await analyze_compliance(contract_text, background_tasks=background_tasks)
         return analysis
         
     except Exception as e:
@@ -698,17 +1191,18 @@ async def upload_contract(file: UploadFile = File(...)):
         os.unlink(temp_path)
 
 @app.post("/analyze-text/", response_model=AnalysisResponse)
-async def analyze_contract_text(request: ComplianceCheckRequest):
+async def analyze_contract_text(request: ComplianceCheckRequest, background_tasks: BackgroundTasks):
     """Analyze contract text directly"""
     if not request.contract_text.strip():
         raise HTTPException(status_code=400, detail="Contract text cannot be empty")
     
     try:
-        analysis = analyze_compliance(
+        analysis = await analyze_compliance(
             request.contract_text, 
             request.regulations,
             request.jurisdiction,
-            request.industry
+            request.industry,
+            background_tasks
         )
         return analysis
     except Exception as e:
@@ -745,10 +1239,10 @@ async def health_check():
         test_prompt = "Respond with 'OK'"
         openrouter_status = "healthy"
         try:
-            response = query_openrouter(test_prompt, "You are a health check responder.")
+            response = await asyncio.to_thread(query_openrouter, test_prompt, "You are a health check responder.")
             if "OK" not in response:
                 openrouter_status = "unhealthy"
-        except:
+        except Exception:
             openrouter_status = "unreachable"
         
         # Test ChromaDB
@@ -773,10 +1267,11 @@ async def health_check():
         }
 
 @app.get("/search-contracts")
-async def search_contracts(query: str, limit: int = 10):
+async def search_contracts(query: str, limit: int = 10, include_documents: bool = True):
     """Search previous contract analyses"""
     try:
-        results = chroma_db.search_contracts(query, limit)
+        fields = ("metadatas", "distances", "documents") if include_documents else ("metadatas", "distances")
+        results = chroma_db.search_contracts(query, limit, fields=fields)
         return {
             "query": query,
             "results": results,
@@ -786,10 +1281,11 @@ async def search_contracts(query: str, limit: int = 10):
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
 
 @app.get("/analysis-history")
-async def get_analysis_history(limit: int = 20, offset: int = 0):
+async def get_analysis_history(limit: int = 20, offset: int = 0, raw: bool = False):
     """Get recent analysis history"""
     try:
-        history = chroma_db.get_analysis_history(limit, offset)
+        # raw=true skips decoding JSON-string fields (e.g. regulations) for clients that don't need them
+        history = chroma_db.get_analysis_history(limit, offset, raw=raw)
         return {
             "history": history,
             "total": len(history),
@@ -799,6 +1295,14 @@ async def get_analysis_history(limit: int = 20, offset: int = 0):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get history: {str(e)}")
 
+@app.get("/stats")
+async def get_stats():
+    """Get contract and analysis statistics"""
+    try:
+        return chroma_db.get_contract_stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get stats: {str(e)}")
+
 if __name__ == "__main__":
     logger.info("🚀 Starting Commercial AI Contract Compliance Checker with OpenRouter...")
     logger.info("📚 Regulations available: Commercial Grade")
@@ -806,9 +1310,18 @@ if __name__ == "__main__":
     logger.info("🔍 Health Check: http://localhost:8000/health")
     logger.info("📧 Notifications: Email, Slack, Google Sheets")
     
+    # Workers need the app as an import string; each one builds its own knowledge base and
+    # Chroma client on import. Chroma's persistent store isn't safe to share between
+    # processes, so scale-out is opt-in via WEB_CONCURRENCY. "auto" picks uvloop and
+    # httptools whenever they are installed.
+    limit_concurrency = os.getenv("LIMIT_CONCURRENCY")
     uvicorn.run(
-        app, 
+        "main:app", 
         host="0.0.0.0", 
         port=int(os.getenv("BACKEND_PORT", 8000)),
+        workers=int(os.getenv("WEB_CONCURRENCY", 1)),
+        loop="auto",
+        http="auto",
+        limit_concurrency=int(limit_concurrency) if limit_concurrency else None,
         log_level="info"
     )
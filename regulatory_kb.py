@@ -1,316 +1,612 @@
-import json
 import re
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+import sys
+from dataclasses import dataclass, field
+from functools import cache, cached_property, lru_cache
+from types import MappingProxyType
+from typing import List, Dict, Any, Optional, Iterable, FrozenSet, Tuple, NamedTuple, Mapping
 import logging
 
 logger = logging.getLogger(__name__)
 
-class CommercialRegulatoryKnowledgeBase:
-    def __init__(self):
-        self.regulatory_data = self._initialize_commercial_regulations()
-        self.jurisdiction_map = self._initialize_jurisdiction_map()
-        self.industry_map = self._initialize_industry_map()
-        logger.info("✅ Commercial Regulatory Knowledge Base initialized")
+_WORD_RE = re.compile(r'\b[a-z]{3,}\b')
+_STOP_WORDS = frozenset({'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'})
+
+# Content signals that pull a regulation in regardless of jurisdiction/industry maps
+FINANCIAL_TERMS = ("loan", "financing", "credit", "interest rate", "apr", "payment", "debt")
+PRIVACY_TERMS = ("personal data", "privacy", "confidential", "data processing", "consumer information")
+SECURITY_TERMS = ("security", "cyber", "data protection", "encryption", "access control")
+CONTENT_REGULATIONS = (
+    (FINANCIAL_TERMS, ("GLBA", "FCRA", "TILA", "EFTA")),
+    (PRIVACY_TERMS, ("CCPA_CPRA",)),
+    (SECURITY_TERMS, ("NY_DFS",))
+)
+
+# Flags checked by analyze_contract_content, each raised by any of its phrases
+CONTENT_FLAGS = {
+    "privacy": ("privacy",),
+    "confidential": ("confidential",),
+    "opt_out": ("opt-out", "opt out"),
+    "credit": ("credit",),
+    "authorization": ("authorization",),
+    "adverse_action": ("adverse action",),
+    "apr": ("apr", "annual percentage rate"),
+    "finance_charge": ("finance charge",)
+}
+
+# Regulation-specific content rules as (when, unless, issue, recommendation): a rule fires
+# when the contract raises every flag in `when` and none of the flags in `unless`
+CONTENT_RULES = {
+    "GLBA": (
+        ((), ("privacy", "confidential"),
+         "Missing financial privacy provisions", "Add GLBA-compliant privacy notice clause"),
+        ((), ("opt_out",),
+         "Missing opt-out mechanisms for information sharing", "Include GLBA opt-out provisions")
+    ),
+    "FCRA": (
+        (("credit",), ("authorization",),
+         "Missing credit check authorization", "Add FCRA-compliant authorization clause"),
+        ((), ("adverse_action",),
+         "Missing adverse action notice procedures", "Include FCRA adverse action requirements")
+    ),
+    "TILA": (
+        ((), ("apr",),
+         "Missing APR disclosure", "Add TILA-required APR disclosure"),
+        ((), ("finance_charge",),
+         "Missing finance charge disclosure", "Include TILA finance charge calculations")
+    )
+}
+
+# Related wording that counts as evidence for a clause
+CLAUSE_CONCEPTS = {
+    "Financial Privacy Notice": ["privacy policy", "data sharing", "opt out", "confidentiality"],
+    "Credit Reporting Authorization": ["credit check", "background check", "consumer report", "authorization"],
+    "Data Safeguards Program": ["security program", "data protection", "encryption", "access control"],
+    "Truth in Lending Disclosures": ["apr", "annual percentage rate", "finance charge", "disclosure"]
+}
+
+# Clause evidence weights in tenths, so presence scoring is pure integer arithmetic:
+# keywords 0.5, requirements 0.3, concepts 0.2, present at 1.0
+KEYWORD_WEIGHT = 5
+REQUIREMENT_WEIGHT = 3
+CONCEPT_WEIGHT = 2
+PRESENCE_THRESHOLD = 10
+
+def _trie_pattern(node: Dict[str, Dict]) -> str:
+    """Regex for the terms below a prefix-trie node, preferring the longest one"""
+    branches = [re.escape(char) + _trie_pattern(child) for char, child in node.items() if char]
+    if not branches:
+        return ""
+    pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if "" in node:
+        # A term ends here; the greedy ? still tries the longer ones first
+        pattern = "(?:" + pattern + ")?"
+    return pattern
+
+class TermScanner:
+    """Finds which of a fixed set of terms occur as substrings of a text in a single pass"""
     
-    def _initialize_commercial_regulations(self) -> Dict[str, List[Dict]]:
-        """Initialize comprehensive commercial regulatory database"""
-        return {
-            "GLBA": [
-                {
-                    "clause": "Financial Privacy Notice",
-                    "description": "Gramm-Leach-Bliley Act privacy requirements for financial institutions",
-                    "risk_level": "high",
-                    "requirements": [
-                        "Privacy notice delivery",
-                        "Opt-out mechanisms",
-                        "Information sharing policies",
-                        "Safeguards rule compliance",
-                        "Annual privacy notices"
-                    ],
-                    "legal_citation": "15 U.S.C. § 6801-6809",
-                    "jurisdictions": ["US"],
-                    "industries": ["financial", "banking", "lending", "insurance"]
-                },
-                {
-                    "clause": "Data Safeguards Program",
-                    "description": "Information security program for customer data protection",
-                    "risk_level": "high",
-                    "requirements": [
-                        "Written security program",
-                        "Employee training",
-                        "Access controls",
-                        "Data encryption",
-                        "Incident response plan"
-                    ],
-                    "legal_citation": "16 CFR Part 314",
-                    "jurisdictions": ["US"],
-                    "industries": ["financial", "banking", "lending"]
-                }
+    def __init__(self, terms: Iterable[str]):
+        self.terms = frozenset(term for term in terms if term)
+        # The alternation is factored into a prefix trie, so the engine walks shared prefixes
+        # once instead of retrying every term at every position. At each start it matches
+        # the longest term; the shorter ones matching there are exactly its prefixes, which
+        # _cover_masks adds back
+        trie: Dict[str, Dict] = {}
+        for term in self.terms:
+            node = trie
+            for char in term:
+                node = node.setdefault(char, {})
+            node[""] = {}
+        self._pattern = re.compile(_trie_pattern(trie))
+        self._initials = frozenset(trie)
+        # Each term owns one bit, so a set of terms is an int and set algebra is bit algebra
+        self.bits = {term: 1 << i for i, term in enumerate(sorted(self.terms))}
+        self._all_mask = (1 << len(self.bits)) - 1
+        self._cover_masks = {
+            term: self.mask(other for other in self.terms if term.startswith(other))
+            for term in self.terms
+        }
+    
+    def mask(self, terms: Iterable[str]) -> int:
+        """Bitmask of the given terms, all of which must belong to this scanner"""
+        mask = 0
+        for term in terms:
+            mask |= self.bits[term]
+        return mask
+    
+    def scan_mask(self, text: str) -> int:
+        """Bitmask of the terms found in text"""
+        # isdisjoint stops at the first character that could start a term, so this only costs
+        # a full pass over texts the regex would find nothing in anyway
+        if self._initials.isdisjoint(text):
+            return 0
+        # A plain (non-lookahead) pattern lets search() skip straight to the next character
+        # that starts a term; resuming one past each match start still sees overlapping terms
+        search = self._pattern.search
+        cover_masks = self._cover_masks
+        found = 0
+        match = search(text)
+        while match is not None:
+            found |= cover_masks[match.group()]
+            if found == self._all_mask:
+                break
+            match = search(text, match.start() + 1)
+        return found
+    
+    def scan(self, text: str) -> FrozenSet[str]:
+        """Return the terms found in text; same result as {t for t in terms if t in text}"""
+        found = self.scan_mask(text)
+        return frozenset(term for term, bit in self.bits.items() if found & bit)
+
+# Regulations with their required clauses, compiled into Clause objects by
+# _knowledge_base_index. Applicability is declared on each regulation's first clause
+_REGULATORY_DATA = MappingProxyType({
+    "GLBA": [
+        {
+            "clause": "Financial Privacy Notice",
+            "description": "Gramm-Leach-Bliley Act privacy requirements for financial institutions",
+            "risk_level": "high",
+            "requirements": [
+                "Privacy notice delivery",
+                "Opt-out mechanisms",
+                "Information sharing policies",
+                "Safeguards rule compliance",
+                "Annual privacy notices"
             ],
-            
-            "FCRA": [
-                {
-                    "clause": "Credit Reporting Authorization",
-                    "description": "Fair Credit Reporting Act requirements for credit checks",
-                    "risk_level": "high",
-                    "requirements": [
-                        "Consumer authorization",
-                        "Permissible purpose certification",
-                        "Adverse action notices",
-                        "Dispute investigation procedures",
-                        "Accuracy requirements"
-                    ],
-                    "legal_citation": "15 U.S.C. § 1681 et seq.",
-                    "jurisdictions": ["US"],
-                    "industries": ["financial", "employment", "lending", "housing"]
-                }
+            "legal_citation": "15 U.S.C. § 6801-6809",
+            "jurisdictions": ["US"],
+            "industries": ["financial", "banking", "lending", "insurance"]
+        },
+        {
+            "clause": "Data Safeguards Program",
+            "description": "Information security program for customer data protection",
+            "risk_level": "high",
+            "requirements": [
+                "Written security program",
+                "Employee training",
+                "Access controls",
+                "Data encryption",
+                "Incident response plan"
             ],
-            
-            "TILA": [
-                {
-                    "clause": "Truth in Lending Disclosures",
-                    "description": "Regulation Z requirements for loan cost disclosures",
-                    "risk_level": "high",
-                    "requirements": [
-                        "APR disclosure",
-                        "Finance charge calculation",
-                        "Payment schedule",
-                        "Total payments disclosure",
-                        "Right of rescission"
-                    ],
-                    "legal_citation": "15 U.S.C. § 1601 et seq.",
-                    "jurisdictions": ["US"],
-                    "industries": ["lending", "financial", "auto_finance", "mortgage"]
-                }
+            "legal_citation": "16 CFR Part 314",
+            "jurisdictions": ["US"],
+            "industries": ["financial", "banking", "lending"]
+        }
+    ],
+
+    "FCRA": [
+        {
+            "clause": "Credit Reporting Authorization",
+            "description": "Fair Credit Reporting Act requirements for credit checks",
+            "risk_level": "high",
+            "requirements": [
+                "Consumer authorization",
+                "Permissible purpose certification",
+                "Adverse action notices",
+                "Dispute investigation procedures",
+                "Accuracy requirements"
             ],
-            
-            "EFTA": [
-                {
-                    "clause": "Electronic Fund Transfer Authorization",
-                    "description": "Regulation E requirements for electronic payments",
-                    "risk_level": "medium",
-                    "requirements": [
-                        "EFT authorization",
-                        "Error resolution procedures",
-                        "Liability limitations",
-                        "Receipt requirements",
-                        "Periodic statements"
-                    ],
-                    "legal_citation": "15 U.S.C. § 1693 et seq.",
-                    "jurisdictions": ["US"],
-                    "industries": ["financial", "banking", "payment_processing"]
-                }
+            "legal_citation": "15 U.S.C. § 1681 et seq.",
+            "jurisdictions": ["US"],
+            "industries": ["financial", "employment", "lending", "housing"]
+        }
+    ],
+
+    "TILA": [
+        {
+            "clause": "Truth in Lending Disclosures",
+            "description": "Regulation Z requirements for loan cost disclosures",
+            "risk_level": "high",
+            "requirements": [
+                "APR disclosure",
+                "Finance charge calculation",
+                "Payment schedule",
+                "Total payments disclosure",
+                "Right of rescission"
             ],
-            
-            "CCPA_CPRA": [
-                {
-                    "clause": "California Consumer Privacy Rights",
-                    "description": "California Consumer Privacy Act and Privacy Rights Act compliance",
-                    "risk_level": "high",
-                    "requirements": [
-                        "Right to know disclosures",
-                        "Right to delete procedures",
-                        "Right to opt-out of sales",
-                        "Non-discrimination policy",
-                        "Data processing agreements"
-                    ],
-                    "legal_citation": "Cal. Civ. Code § 1798.100 et seq.",
-                    "jurisdictions": ["US_CA", "US"],
-                    "industries": ["all"]
-                }
+            "legal_citation": "15 U.S.C. § 1601 et seq.",
+            "jurisdictions": ["US"],
+            "industries": ["lending", "financial", "auto_finance", "mortgage"]
+        }
+    ],
+
+    "EFTA": [
+        {
+            "clause": "Electronic Fund Transfer Authorization",
+            "description": "Regulation E requirements for electronic payments",
+            "risk_level": "medium",
+            "requirements": [
+                "EFT authorization",
+                "Error resolution procedures",
+                "Liability limitations",
+                "Receipt requirements",
+                "Periodic statements"
             ],
-            
-            "NY_DFS": [
-                {
-                    "clause": "NYDFS Cybersecurity Requirements",
-                    "description": "New York Department of Financial Services cybersecurity regulation",
-                    "risk_level": "high",
-                    "requirements": [
-                        "Cybersecurity program",
-                        "Chief Information Security Officer",
-                        "Penetration testing",
-                        "Audit trail systems",
-                        "Incident response plan"
-                    ],
-                    "legal_citation": "23 NYCRR Part 500",
-                    "jurisdictions": ["US_NY", "US"],
-                    "industries": ["financial", "insurance", "banking"]
-                }
-            ]
+            "legal_citation": "15 U.S.C. § 1693 et seq.",
+            "jurisdictions": ["US"],
+            "industries": ["financial", "banking", "payment_processing"]
         }
-    
-    def _initialize_jurisdiction_map(self) -> Dict[str, List[str]]:
-        """Map jurisdictions to applicable regulations"""
-        return {
-            "US": ["GLBA", "FCRA", "TILA", "EFTA", "CCPA_CPRA"],
-            "US_CA": ["GLBA", "FCRA", "TILA", "EFTA", "CCPA_CPRA", "NY_DFS"],
-            "US_NY": ["GLBA", "FCRA", "TILA", "EFTA", "CCPA_CPRA", "NY_DFS"],
-            "global": ["CCPA_CPRA"]
+    ],
+
+    "CCPA_CPRA": [
+        {
+            "clause": "California Consumer Privacy Rights",
+            "description": "California Consumer Privacy Act and Privacy Rights Act compliance",
+            "risk_level": "high",
+            "requirements": [
+                "Right to know disclosures",
+                "Right to delete procedures",
+                "Right to opt-out of sales",
+                "Non-discrimination policy",
+                "Data processing agreements"
+            ],
+            "legal_citation": "Cal. Civ. Code § 1798.100 et seq.",
+            "jurisdictions": ["US_CA", "US"],
+            "industries": ["all"]
         }
-    
-    def _initialize_industry_map(self) -> Dict[str, List[str]]:
-        """Map industries to applicable regulations"""
-        return {
-            "financial": ["GLBA", "FCRA", "TILA", "EFTA", "NY_DFS"],
-            "banking": ["GLBA", "FCRA", "TILA", "EFTA", "NY_DFS"],
-            "lending": ["GLBA", "FCRA", "TILA", "EFTA"],
-            "insurance": ["GLBA", "NY_DFS"],
-            "auto_finance": ["GLBA", "FCRA", "TILA", "EFTA"],
-            "general": ["CCPA_CPRA"]
+    ],
+
+    "NY_DFS": [
+        {
+            "clause": "NYDFS Cybersecurity Requirements",
+            "description": "New York Department of Financial Services cybersecurity regulation",
+            "risk_level": "high",
+            "requirements": [
+                "Cybersecurity program",
+                "Chief Information Security Officer",
+                "Penetration testing",
+                "Audit trail systems",
+                "Incident response plan"
+            ],
+            "legal_citation": "23 NYCRR Part 500",
+            "jurisdictions": ["US_NY", "US"],
+            "industries": ["financial", "insurance", "banking"]
         }
+    ]
+})
+
+# Jurisdictions to applicable regulations
+_JURISDICTION_MAP = MappingProxyType({
+    "US": ("GLBA", "FCRA", "TILA", "EFTA", "CCPA_CPRA"),
+    "US_CA": ("GLBA", "FCRA", "TILA", "EFTA", "CCPA_CPRA", "NY_DFS"),
+    "US_NY": ("GLBA", "FCRA", "TILA", "EFTA", "CCPA_CPRA", "NY_DFS"),
+    "global": ("CCPA_CPRA",)
+})
+
+# Industries to applicable regulations
+_INDUSTRY_MAP = MappingProxyType({
+    "financial": ("GLBA", "FCRA", "TILA", "EFTA", "NY_DFS"),
+    "banking": ("GLBA", "FCRA", "TILA", "EFTA", "NY_DFS"),
+    "lending": ("GLBA", "FCRA", "TILA", "EFTA"),
+    "insurance": ("GLBA", "NY_DFS"),
+    "auto_finance": ("GLBA", "FCRA", "TILA", "EFTA"),
+    "general": ("CCPA_CPRA",)
+})
+
+def _extract_keywords(text: str) -> Tuple[str, ...]:
+    """Extract meaningful keywords from text"""
+    return tuple(word for word in _WORD_RE.findall(text.lower()) if word not in _STOP_WORDS)[:5]
+
+@dataclass(frozen=True, slots=True)
+class Clause:
+    """A clause a regulation requires, with the scanner masks used to detect it"""
+    clause: str
+    description: str
+    risk_level: str
+    requirements: Tuple[str, ...]
+    legal_citation: str
+    jurisdictions: FrozenSet[str]
+    industries: FrozenSet[str]
+    keyword_mask: int = field(default=0, repr=False, compare=False)
+    requirement_masks: Tuple[int, ...] = field(default=(), repr=False, compare=False)
+    concept_mask: int = field(default=0, repr=False, compare=False)
+
+def _intern(value: Any) -> Any:
+    """Intern strings so lookups against the (interned) knowledge base keys hit the identity fast path"""
+    return sys.intern(value) if type(value) is str else value
+
+def _assign_bits(names: Iterable[str]) -> Dict[str, int]:
+    """One bit per distinct name, in sorted order"""
+    return {sys.intern(name): 1 << i for i, name in enumerate(sorted(set(names)))}
+
+def _bitmask(bits: Dict[str, int], names: Iterable[str]) -> int:
+    """OR of the bits of the given names"""
+    mask = 0
+    for name in names:
+        mask |= bits[name]
+    return mask
+
+class _KnowledgeBaseIndex(NamedTuple):
+    regulations: Mapping[str, Tuple[Clause, ...]]
+    scanner: TermScanner
+    jurisdiction_bits: Dict[str, int]
+    industry_bits: Dict[str, int]
+    reg_jurisdiction_masks: Dict[str, int]
+    reg_industry_masks: Dict[str, int]
+    reg_bits: Dict[str, int]
+    jurisdiction_reg_masks: Dict[str, int]
+    industry_reg_masks: Dict[str, int]
+    content_reg_masks: Tuple[Tuple[int, int], ...]
+    flag_masks: Dict[str, int]
+
+@cache
+def _knowledge_base_index() -> _KnowledgeBaseIndex:
+    """Matching structures derived from the regulatory data, built once per process"""
+    # Lowercase matching fields of every clause, derived once instead of per contract:
+    # name keywords and the words of the first three requirements
+    prepared = {
+        regulation: [
+            (
+                clause_data,
+                _extract_keywords(clause_data['clause']),
+                tuple(tuple(req.lower().split()) for req in clause_data['requirements'][:3])
+            )
+            for clause_data in clauses
+        ]
+        for regulation, clauses in _REGULATORY_DATA.items()
+    }
+    
+    # Every substring test the knowledge base makes is answered by one scan per contract
+    terms = []
+    for signal_terms, _ in CONTENT_REGULATIONS:
+        terms.extend(signal_terms)
+    for phrases in CONTENT_FLAGS.values():
+        terms.extend(phrases)
+    for concepts in CLAUSE_CONCEPTS.values():
+        terms.extend(concepts)
+    for entries in prepared.values():
+        for _, keywords, requirement_words in entries:
+            terms.extend(keywords)
+            for words in requirement_words:
+                terms.extend(words)
+    scanner = TermScanner(terms)
+    
+    regulations = MappingProxyType({
+        sys.intern(regulation): tuple(
+            Clause(
+                clause=clause_data['clause'],
+                description=clause_data['description'],
+                risk_level=clause_data['risk_level'],
+                requirements=tuple(clause_data['requirements']),
+                legal_citation=clause_data.get('legal_citation', ''),
+                jurisdictions=frozenset(clause_data.get('jurisdictions', [])),
+                industries=frozenset(clause_data.get('industries', [])),
+                keyword_mask=scanner.mask(keywords),
+                requirement_masks=tuple(scanner.mask(words) for words in requirement_words),
+                concept_mask=scanner.mask(CLAUSE_CONCEPTS.get(clause_data['clause'], []))
+            )
+            for clause_data, keywords, requirement_words in entries
+        )
+        for regulation, entries in prepared.items()
+    })
+    
+    # Regulation sets are bitmasks over the regulations in sorted order, so unions are ORs
+    # and reading a mask back in bit order yields the sorted list directly
+    names = set(regulations)
+    for regs in (*_JURISDICTION_MAP.values(), *_INDUSTRY_MAP.values()):
+        names.update(regs)
+    for _, regs in CONTENT_REGULATIONS:
+        names.update(regs)
+    reg_bits = _assign_bits(names)
+    
+    # Applicability is declared on each regulation's first clause. Jurisdictions and
+    # industries get bits too, with the "global" and "all" wildcards always present, so
+    # the compatibility test is two ANDs
+    applicability = {regulation: clauses[0] for regulation, clauses in regulations.items() if clauses}
+    jurisdiction_bits = _assign_bits(
+        ["global", *(j for clause in applicability.values() for j in clause.jurisdictions)]
+    )
+    industry_bits = _assign_bits(
+        ["all", *(i for clause in applicability.values() for i in clause.industries)]
+    )
+    
+    return _KnowledgeBaseIndex(
+        regulations=regulations,
+        scanner=scanner,
+        jurisdiction_bits=jurisdiction_bits,
+        industry_bits=industry_bits,
+        reg_jurisdiction_masks={
+            regulation: _bitmask(jurisdiction_bits, clause.jurisdictions) for regulation, clause in applicability.items()
+        },
+        reg_industry_masks={
+            regulation: _bitmask(industry_bits, clause.industries) for regulation, clause in applicability.items()
+        },
+        reg_bits=reg_bits,
+        jurisdiction_reg_masks={
+            jurisdiction: _bitmask(reg_bits, regs) for jurisdiction, regs in _JURISDICTION_MAP.items()
+        },
+        industry_reg_masks={industry: _bitmask(reg_bits, regs) for industry, regs in _INDUSTRY_MAP.items()},
+        content_reg_masks=tuple(
+            (scanner.mask(signal_terms), _bitmask(reg_bits, regs)) for signal_terms, regs in CONTENT_REGULATIONS
+        ),
+        flag_masks={flag: scanner.mask(phrases) for flag, phrases in CONTENT_FLAGS.items()}
+    )
+
+class CommercialRegulatoryKnowledgeBase:
+    def __init__(self):
+        # The data and everything derived from it are shared and built on first use;
+        # instances only hold references and their own result caches
+        self.jurisdiction_map = _JURISDICTION_MAP
+        self.industry_map = _INDUSTRY_MAP
+        # The analysis calls in with the same lowered text once per regulation
+        self._scan = lru_cache(maxsize=8)(self._scan_text)
+        # Past the scan, every result depends on the contract only through its hit mask;
+        # identical or equivalent contracts skip the rules entirely
+        self._regulations_for_hits = lru_cache(maxsize=512)(self._regulations_for_hits)
+        self._missing_clauses_for_hits = lru_cache(maxsize=512)(self._missing_clauses_for_hits)
+        self._content_findings_for_hits = lru_cache(maxsize=512)(self._content_findings_for_hits)
+        self._compatible_regulations = lru_cache(maxsize=64)(self._compatible_regulations)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("✅ Commercial Regulatory Knowledge Base initialized")
+    
+    @cached_property
+    def _index(self) -> _KnowledgeBaseIndex:
+        return _knowledge_base_index()
+    
+    @cached_property
+    def regulatory_data(self) -> Mapping[str, Tuple[Clause, ...]]:
+        return self._index.regulations
+    
+    def _scan_text(self, contract_lower: str) -> int:
+        return self._index.scanner.scan_mask(contract_lower)
     
-    def get_applicable_regulations(self, contract_text: str, jurisdiction: str = "US", industry: str = "general") -> List[str]:
+    def get_applicable_regulations(self, contract_text: str, jurisdiction: str = "US", industry: str = "general",
+                                   contract_lower: Optional[str] = None) -> List[str]:
         """Determine applicable regulations based on contract content, jurisdiction, and industry"""
-        contract_lower = contract_text.lower()
-        
+        if contract_lower is None:
+            contract_lower = contract_text.lower()
+        jurisdiction, industry = _intern(jurisdiction), _intern(industry)
+        return list(self._regulations_for_hits(self._scan(contract_lower), jurisdiction, industry))
+    
+    def _regulations_for_hits(self, hit_mask: int, jurisdiction: str, industry: str) -> Tuple[str, ...]:
+        """Applicable regulations for a contract with the given scan hits"""
         # Start with jurisdiction-based regulations
-        applicable_regulations = set(self.jurisdiction_map.get(jurisdiction, []))
+        applicable_regulations = self._index.jurisdiction_reg_masks.get(jurisdiction, 0)
         
         # Add industry-specific regulations
-        applicable_regulations.update(self.industry_map.get(industry, []))
+        applicable_regulations |= self._index.industry_reg_masks.get(industry, 0)
         
         # Content-based regulation detection
-        content_based_regs = self._detect_regulations_from_content(contract_lower)
-        applicable_regulations.update(content_based_regs)
+        applicable_regulations |= self._detect_regulations_from_content(hit_mask)
         
         # Remove inappropriate regulations based on content analysis
-        self._filter_inappropriate_regulations(applicable_regulations, contract_lower, jurisdiction, industry)
+        applicable_regulations = self._filter_inappropriate_regulations(
+            applicable_regulations, hit_mask, jurisdiction, industry
+        )
         
-        return sorted(list(applicable_regulations))
+        # Bits are assigned in sorted order
+        return tuple(regulation for regulation, bit in self._index.reg_bits.items() if applicable_regulations & bit)
     
-    def _detect_regulations_from_content(self, contract_text: str) -> List[str]:
-        """Detect regulations based on contract content analysis"""
-        detected_regulations = set()
-        
-        # Financial content detection
-        financial_terms = ["loan", "financing", "credit", "interest rate", "apr", "payment", "debt"]
-        if any(term in contract_text for term in financial_terms):
-            detected_regulations.update(["GLBA", "FCRA", "TILA", "EFTA"])
-        
-        # Privacy content detection
-        privacy_terms = ["personal data", "privacy", "confidential", "data processing", "consumer information"]
-        if any(term in contract_text for term in privacy_terms):
-            detected_regulations.update(["CCPA_CPRA"])
-        
-        # Cybersecurity content detection
-        security_terms = ["security", "cyber", "data protection", "encryption", "access control"]
-        if any(term in contract_text for term in security_terms):
-            detected_regulations.update(["NY_DFS"])
-        
-        return list(detected_regulations)
+    def _detect_regulations_from_content(self, hit_mask: int) -> int:
+        """Detect regulations based on contract content analysis; returns a regulation mask"""
+        detected_regulations = 0
+        for term_mask, regulations_mask in self._index.content_reg_masks:
+            if hit_mask & term_mask:
+                detected_regulations |= regulations_mask
+        return detected_regulations
     
-    def _filter_inappropriate_regulations(self, regulations: set, contract_text: str, jurisdiction: str, industry: str):
-        """Remove regulations that don't apply to this context"""
-        inappropriate_regs = set()
-        
-        for regulation in regulations:
-            reg_data = self.regulatory_data.get(regulation, [])
-            if not reg_data:
-                continue
-            
-            # Check jurisdiction compatibility
-            first_clause = reg_data[0]
-            allowed_jurisdictions = first_clause.get('jurisdictions', [])
-            if jurisdiction not in allowed_jurisdictions and "global" not in allowed_jurisdictions:
-                inappropriate_regs.add(regulation)
-                continue
-            
-            # Check industry compatibility
-            allowed_industries = first_clause.get('industries', [])
-            if industry not in allowed_industries and "all" not in allowed_industries:
-                inappropriate_regs.add(regulation)
-                continue
-        
-        regulations.difference_update(inappropriate_regs)
+    def _filter_inappropriate_regulations(self, regulations: int, hit_mask: int, jurisdiction: str, industry: str) -> int:
+        """Keep only the regulations in the mask that apply to this context"""
+        return regulations & self._compatible_regulations(jurisdiction, industry)
     
-    def get_missing_clauses(self, contract_text: str, regulation: str) -> List[Dict]:
+    def _compatible_regulations(self, jurisdiction: str, industry: str) -> int:
+        """Mask of the regulations whose declared jurisdictions and industries admit this context"""
+        jurisdiction_bits = self._index.jurisdiction_bits.get(jurisdiction, 0) | self._index.jurisdiction_bits["global"]
+        industry_bits = self._index.industry_bits.get(industry, 0) | self._index.industry_bits["all"]
+        compatible = 0
+        for regulation, bit in self._index.reg_bits.items():
+            # Regulations without clause data carry no restrictions
+            if regulation not in self._index.reg_jurisdiction_masks or (
+                    self._index.reg_jurisdiction_masks[regulation] & jurisdiction_bits
+                    and self._index.reg_industry_masks[regulation] & industry_bits):
+                compatible |= bit
+        return compatible
+    
+    def get_missing_clauses(self, contract_text: str, regulation: str, contract_lower: Optional[str] = None) -> List[Clause]:
         """Advanced clause detection with context awareness"""
+        regulation = _intern(regulation)
         if regulation not in self.regulatory_data:
             return []
         
-        contract_lower = contract_text.lower()
-        missing_clauses = []
-        
-        for clause_data in self.regulatory_data[regulation]:
-            if not self._is_clause_present(clause_data, contract_lower):
-                missing_clauses.append(clause_data)
-        
-        return missing_clauses
+        if contract_lower is None:
+            contract_lower = contract_text.lower()
+        return list(self._missing_clauses_for_hits(self._scan(contract_lower), regulation))
+    
+    def _missing_clauses_for_hits(self, hit_mask: int, regulation: str) -> Tuple[Clause, ...]:
+        """Clauses of a regulation not evidenced by the given scan hits"""
+        return tuple(
+            clause for clause in self.regulatory_data[regulation]
+            if not self._is_clause_present(clause, hit_mask)
+        )
     
-    def _is_clause_present(self, clause_data: Dict, contract_text: str) -> bool:
+    def _is_clause_present(self, clause: Clause, hit_mask: int) -> bool:
         """Check if a clause is present in the contract using multiple detection strategies"""
-        clause_name = clause_data['clause'].lower()
-        description = clause_data['description'].lower()
-        requirements = [req.lower() for req in clause_data['requirements']]
-        
         # Strategy 1: Direct keyword matching
-        keywords = self._extract_keywords(clause_name)
-        direct_matches = sum(1 for keyword in keywords if keyword in contract_text)
+        direct_matches = (hit_mask & clause.keyword_mask).bit_count()
         
-        # Strategy 2: Requirement-based matching
-        requirement_matches = sum(1 for req in requirements[:3] if any(word in contract_text for word in req.split()))
+        # Strategy 2: Requirement-based matching (first three requirements, any word each)
+        requirement_matches = sum(1 for mask in clause.requirement_masks if hit_mask & mask)
         
         # Strategy 3: Semantic concept matching
-        concept_matches = self._check_semantic_concepts(clause_data, contract_text)
+        concept_matches = self._check_semantic_concepts(clause, hit_mask)
         
         # Weighted scoring
-        total_score = (direct_matches * 0.5) + (requirement_matches * 0.3) + (concept_matches * 0.2)
+        total_score = (direct_matches * KEYWORD_WEIGHT + requirement_matches * REQUIREMENT_WEIGHT
+                       + concept_matches * CONCEPT_WEIGHT)
         
-        return total_score >= 1.0
+        return total_score >= PRESENCE_THRESHOLD
     
-    def _extract_keywords(self, text: str) -> List[str]:
-        """Extract meaningful keywords from text"""
-        stop_words = {'the', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'}
-        words = re.findall(r'\b[a-z]{3,}\b', text.lower())
-        return [word for word in words if word not in stop_words][:5]
-    
-    def _check_semantic_concepts(self, clause_data: Dict, contract_text: str) -> int:
+    def _check_semantic_concepts(self, clause: Clause, hit_mask: int) -> int:
         """Check for semantic concepts related to the clause"""
-        concept_map = {
-            "Financial Privacy Notice": ["privacy policy", "data sharing", "opt out", "confidentiality"],
-            "Credit Reporting Authorization": ["credit check", "background check", "consumer report", "authorization"],
-            "Data Safeguards Program": ["security program", "data protection", "encryption", "access control"],
-            "Truth in Lending Disclosures": ["apr", "annual percentage rate", "finance charge", "disclosure"]
+        return (hit_mask & clause.concept_mask).bit_count()
+    
+    def analyze_contract_content(self, contract_text: str, regulation: str,
+                                 contract_lower: Optional[str] = None) -> Dict[str, List[str]]:
+        """Analyze contract content for regulation-specific issues"""
+        if contract_lower is None:
+            contract_lower = contract_text.lower()
+        regulation = _intern(regulation)
+        issues, recommendations = self._content_findings_for_hits(self._scan(contract_lower), regulation)
+        return {
+            "issues": list(issues),
+            "recommendations": list(recommendations)
         }
+    
+    def analyze_many(self, contracts: Iterable[str], jurisdiction: str = "US",
+                     industry: str = "general", regulations: Optional[Iterable[str]] = None,
+                     contracts_lower: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Rule-based findings for a batch of contracts sharing a jurisdiction and industry
         
-        concepts = concept_map.get(clause_data['clause'], [])
-        return sum(1 for concept in concepts if concept in contract_text)
+        Each entry holds the applicable regulations plus, per regulation, the missing clauses
+        and the content analysis, exactly as the single-contract methods return them. Every
+        contract is scanned once; contracts with the same hits share one rule evaluation.
+        Given regulations are checked for every contract instead of the applicable ones;
+        contracts_lower, when the caller already has it, is the lowercased contracts in order.
+        """
+        jurisdiction, industry = _intern(jurisdiction), _intern(industry)
+        requested = None if regulations is None else tuple(map(_intern, regulations))
+        if contracts_lower is None:
+            contracts_lower = (contract_text.lower() for contract_text in contracts)
+        results = []
+        for contract_lower in contracts_lower:
+            # Straight to the scanner: a batch would only churn the small per-text memo
+            hit_mask = self._index.scanner.scan_mask(contract_lower)
+            regulations = (
+                requested if requested is not None
+                else self._regulations_for_hits(hit_mask, jurisdiction, industry)
+            )
+            missing_clauses = {}
+            content_analysis = {}
+            for regulation in regulations:
+                missing_clauses[regulation] = (
+                    list(self._missing_clauses_for_hits(hit_mask, regulation))
+                    if regulation in self.regulatory_data else []
+                )
+                issues, recommendations = self._content_findings_for_hits(hit_mask, regulation)
+                content_analysis[regulation] = {
+                    "issues": list(issues),
+                    "recommendations": list(recommendations)
+                }
+            results.append({
+                "regulations": list(regulations),
+                "missing_clauses": missing_clauses,
+                "content_analysis": content_analysis
+            })
+        return results
     
-    def analyze_contract_content(self, contract_text: str, regulation: str) -> Dict[str, List[str]]:
-        """Analyze contract content for regulation-specific issues"""
+    def _scan_flags(self, hit_mask: int) -> Dict[str, bool]:
+        """Which CONTENT_FLAGS the scan hits raise"""
+        return {flag: bool(hit_mask & mask) for flag, mask in self._index.flag_masks.items()}
+    
+    def _content_findings_for_hits(self, hit_mask: int, regulation: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+        """Regulation-specific (issues, recommendations) for the given scan hits"""
         issues = []
         recommendations = []
-        contract_lower = contract_text.lower()
-        
-        if regulation == "GLBA":
-            if "privacy" not in contract_lower and "confidential" not in contract_lower:
-                issues.append("Missing financial privacy provisions")
-                recommendations.append("Add GLBA-compliant privacy notice clause")
-            
-            if "opt-out" not in contract_lower and "opt out" not in contract_lower:
-                issues.append("Missing opt-out mechanisms for information sharing")
-                recommendations.append("Include GLBA opt-out provisions")
-        
-        elif regulation == "FCRA":
-            if "credit" in contract_lower and "authorization" not in contract_lower:
-                issues.append("Missing credit check authorization")
-                recommendations.append("Add FCRA-compliant authorization clause")
-            
-            if "adverse action" not in contract_lower:
-                issues.append("Missing adverse action notice procedures")
-                recommendations.append("Include FCRA adverse action requirements")
+        flags = self._scan_flags(hit_mask)
         
-        elif regulation == "TILA":
-            if "apr" not in contract_lower and "annual percentage rate" not in contract_lower:
-                issues.append("Missing APR disclosure")
-                recommendations.append("Add TILA-required APR disclosure")
-            
-            if "finance charge" not in contract_lower:
-                issues.append("Missing finance charge disclosure")
-                recommendations.append("Include TILA finance charge calculations")
+        for when, unless, issue, recommendation in CONTENT_RULES.get(regulation, ()):
+            if all(flags[flag] for flag in when) and not any(flags[flag] for flag in unless):
+                issues.append(issue)
+                recommendations.append(recommendation)
         
-        return {
-            "issues": issues,
-            "recommendations": recommendations
-        }
+        return tuple(issues), tuple(recommendations)